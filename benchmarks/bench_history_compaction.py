@@ -0,0 +1,92 @@
+"""Replay a 100-turn consultation with and without token-budgeted history compaction.
+
+Latency and cost are modelled from input tokens so the run is offline and deterministic;
+adjust the constants below to match current Gemini pricing and observed latency.
+
+Run from the repository root: python -m benchmarks.bench_history_compaction
+"""
+
+import time
+
+from finance_chatbot.conversation import HistoryCompactor, build_history
+from finance_chatbot.fake_genai import FakeGenaiClient
+
+CHARS_PER_TOKEN = 4
+TURNS = 100
+BUDGETS = [None, 16000, 8000, 4000]
+KEEP_RECENT_TURNS = 4
+BASE_LATENCY_SECONDS = 0.4
+LATENCY_PER_1K_INPUT_TOKENS = 0.12
+CHAT_PRICE_PER_1M_INPUT = 1.25
+SUMMARY_PRICE_PER_1M_INPUT = 0.30
+ANSWER = "Budget recommendation with a worked example, numbered steps and a short checklist. " * 10
+DIGEST = "- Goal: pay down USD 5,000 card debt in 90 days; risk level 2; monthly surplus USD 600. " * 4
+
+
+def user_message(turn: int) -> str:
+    return f"Turn {turn}: my rent rose by USD {50 + turn}; how should I rebalance groceries and savings this month?"
+
+
+def tokens(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def replay(budget: int | None) -> dict:
+    summary_input_chars = [0]
+    summary_calls = [0]
+
+    def summarize(prompt: str) -> str:
+        summary_input_chars[0] += len(prompt)
+        summary_calls[0] += 1
+        return DIGEST
+
+    client = FakeGenaiClient(reply=lambda prompt: ANSWER)
+    compactor = HistoryCompactor(budget or 0, KEEP_RECENT_TURNS, summarize, CHARS_PER_TOKEN)
+    chat = client.chats.create(model="bench")
+    messages: list = []
+    digest, digest_upto = "", 0
+    input_tokens = 0
+    peak_history = 0
+    overhead = 0.0
+    for turn in range(TURNS):
+        started = time.perf_counter()
+        history_tokens = compactor.tokens(chat.get_history())
+        if budget is not None and history_tokens > budget:
+            digest, digest_upto = compactor.compact(messages, digest, digest_upto, "English")
+            chat = client.chats.create(model="bench", history=build_history(messages, digest, digest_upto))
+            history_tokens = compactor.tokens(chat.get_history())
+        overhead += time.perf_counter() - started
+        prompt = user_message(turn)
+        peak_history = max(peak_history, history_tokens)
+        input_tokens += history_tokens + tokens(len(prompt))
+        chat.send_message(prompt)
+        messages += [{"role": "user", "content": prompt}, {"role": "assistant", "content": ANSWER}]
+    summary_tokens = tokens(summary_input_chars[0])
+    return {
+        "input_tokens": input_tokens,
+        "summary_tokens": summary_tokens,
+        "peak_history": peak_history,
+        "latency": (TURNS + summary_calls[0]) * BASE_LATENCY_SECONDS
+        + (input_tokens + summary_tokens) / 1000 * LATENCY_PER_1K_INPUT_TOKENS,
+        "cost": input_tokens / 1e6 * CHAT_PRICE_PER_1M_INPUT + summary_tokens / 1e6 * SUMMARY_PRICE_PER_1M_INPUT,
+        "overhead_ms": overhead * 1000,
+    }
+
+
+def main() -> None:
+    header = (
+        f"{'budget':>8} {'chat input tok':>15} {'digest tok':>11} {'peak history':>13} "
+        f"{'model latency s':>16} {'cost USD':>9} {'local ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for budget in BUDGETS:
+        result = replay(budget)
+        print(
+            f"{budget or 'none':>8} {result['input_tokens']:>15} {result['summary_tokens']:>11} {result['peak_history']:>13} "
+            f"{result['latency']:>16.1f} {result['cost']:>9.4f} {result['overhead_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Bytes sent and caption latency for image uploads, raw versus normalised, deduplicated and batched.
+
+"Before" captions every upload's original bytes in its own request, four at a time, as ingestion used to.
+"After" runs the same uploads through ``prepare_documents``. Gemini is replaced by ``FakeGenaiClient`` with a
+fixed per-request latency plus an upload cost per MiB of request payload; adjust the constants to match
+observed network conditions.
+
+Run from the repository root: python -m benchmarks.bench_images
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import UploadedBytes, make_photo, make_png
+from finance_chatbot.documents import IMAGE_TYPES, describe_image_bytes, prepare_documents
+from finance_chatbot.fake_genai import FakeGenaiClient
+
+REQUEST_LATENCY_SECONDS = 0.8
+UPLOAD_SECONDS_PER_MIB = 0.5
+WORKERS = 4
+
+
+def uploads() -> list:
+    screenshot = make_png(1170, 2532, seed=3)
+    return [
+        UploadedBytes("receipt-photo-1.jpg", make_photo(4032, 3024, seed=1)),
+        UploadedBytes("receipt-photo-2.jpg", make_photo(4032, 3024, seed=2)),
+        UploadedBytes("bank-app-screenshot.png", screenshot),
+        UploadedBytes("bank-app-screenshot-again.png", screenshot),
+        UploadedBytes("invoice-small.png", make_png(600, 800, seed=4)),
+        UploadedBytes("budget-chart.png", make_png(800, 600, seed=5)),
+        UploadedBytes("bill.png", make_png(640, 900, seed=6)),
+    ]
+
+
+def batch_reply(prompt: str) -> str:
+    count = re.search(r"each of the (\d+) images", prompt)
+    if count is None:
+        return "- Receipt total: USD 42.10"
+    return "\n".join(f"Image {number}:\n- Receipt total: USD {number * 10}.00" for number in range(1, int(count.group(1)) + 1))
+
+
+def client() -> FakeGenaiClient:
+    return FakeGenaiClient(latency=REQUEST_LATENCY_SECONDS, seconds_per_mib=UPLOAD_SECONDS_PER_MIB, reply=batch_reply)
+
+
+def before(files: list) -> dict:
+    fake = client()
+    latencies = {}
+
+    def caption(uploaded) -> None:
+        data = uploaded.getvalue()
+        started = time.perf_counter()
+        describe_image_bytes(fake, data, IMAGE_TYPES["." + uploaded.name.rsplit(".", 1)[1]])
+        latencies[uploaded.name] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(caption, files))
+    return {
+        "wall": time.perf_counter() - started,
+        "requests": len(fake.calls),
+        "payload_chars": sum(call["chars"] for call in fake.calls),
+        "sent": {uploaded.name: len(uploaded.getvalue()) for uploaded in files},
+        "latency": latencies,
+    }
+
+
+def after(files: list) -> dict:
+    fake = client()
+    started = time.perf_counter()
+    documents, errors = prepare_documents(files, fake, max_workers=WORKERS)
+    if errors:
+        raise RuntimeError(errors)
+    return {
+        "wall": time.perf_counter() - started,
+        "requests": len(fake.calls),
+        "payload_chars": sum(call["chars"] for call in fake.calls),
+        "sent": {doc["name"]: 0 if "duplicate_of" in doc else doc["sent_bytes"] for doc in documents},
+        "latency": {doc["name"]: doc["caption_ms"] / 1000 for doc in documents},
+        "batch": {doc["name"]: doc["caption_batch"] for doc in documents},
+        "duplicate": {doc["name"]: doc.get("duplicate_of", "") for doc in documents},
+    }
+
+
+def main() -> None:
+    files = uploads()
+    raw, tuned = before(files), after(files)
+    header = f"{'image':<30} {'bytes before':>13} {'bytes after':>12} {'caption s before':>17} {'caption s after':>16}  note"
+    print(header)
+    print("-" * len(header))
+    for uploaded in files:
+        name = uploaded.name
+        note = f"duplicate of {tuned['duplicate'][name]}" if tuned["duplicate"][name] else ""
+        if not note and tuned["batch"][name] > 1:
+            note = f"batch of {tuned['batch'][name]}"
+        print(
+            f"{name:<30} {raw['sent'][name]:>13,} {tuned['sent'][name]:>12,} "
+            f"{raw['latency'][name]:>17.2f} {tuned['latency'][name]:>16.2f}  {note}"
+        )
+    print()
+    for label, result in (("before", raw), ("after", tuned)):
+        print(
+            f"{label:<7} requests {result['requests']:>2}  bytes sent {sum(result['sent'].values()):>12,}  "
+            f"payload chars {result['payload_chars']:>12,}  wall {result['wall']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Load test: how many concurrent chat sessions one process serves before turn latency degrades.
+
+Each simulated session follows a typical flow against ``ChatEngine``, the pipeline behind the Streamlit page. It
+uploads a PDF statement and a CSV export (unique per session, so the document cache does not hide extraction
+cost), then sends ``--turns`` chat turns. Between turns it sometimes moves the creativity or risk slider, which
+rebuilds the persona and chat on the next turn the same way a page rerun does. Gemini is a ``FakeGenaiClient``
+with ``--latency`` seconds per reply. Sessions think for ``--think`` seconds on average between actions; the
+default of 0 is a closed loop that finds peak throughput.
+
+Every concurrency level runs in a fresh interpreter, so the CPU and resident memory figures belong to that level
+alone. A level counts as saturated once throughput grows by less than ``SCALING_FLOOR`` of the previous level or
+p95 turn latency exceeds ``LATENCY_CEILING`` times the single-session p95. Streamlit's own render cost per
+rerun is measured separately by ``bench_rerun``.
+
+Run from the repository root:
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --levels 1,8,32,64 --latency 1.5 --think 2
+    python -m benchmarks.bench_load --gemini-concurrency 64 --json load.json
+"""
+
+import argparse
+import asyncio
+import functools
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+from benchmarks.bench_pipeline import git_commit
+from benchmarks.synthetic import UploadedBytes, make_csv, make_pdf
+from finance_chatbot.engine import (
+    ENGINE_WORKERS,
+    GEMINI_BREAKER_RESET_SECONDS,
+    GEMINI_BREAKER_THRESHOLD,
+    GEMINI_DEADLINE_SECONDS,
+    GEMINI_MAX_ATTEMPTS,
+    GEMINI_MAX_CONCURRENCY,
+    ChatEngine,
+    ChatSettings,
+)
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.locales import USE_CASE_ORDER, USE_CASES
+from finance_chatbot.resilience import CircuitBreaker, ResilientCaller
+
+DEFAULT_LEVELS = "1,2,4,8,16,32,64"
+SCALING_FLOOR = 1.1
+LATENCY_CEILING = 2.0
+SLIDER_PROBABILITY = 0.3
+PDF_PAGES = 5
+CSV_ROWS = 2_000
+FOLLOW_UPS = [
+    "How much did I spend on groceries and dining last month?",
+    "Which subscriptions could I cancel to free up cash?",
+    "I want to save USD 5,000 within 12 months. What should I set aside each week?",
+    "Is my rent above 30% of my salary?",
+]
+
+
+def resident_mib() -> float:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))] if ordered else 0.0
+
+
+async def session_flow(engine: ChatEngine, index: int, args, stats: dict) -> None:
+    rng = random.Random(index)
+    use_case = USE_CASE_ORDER[index % len(USE_CASE_ORDER)]
+    session = engine.new_session(
+        "load-test-key",
+        ChatSettings(use_case=use_case, knowledge_domains=list(USE_CASES[use_case]["default_domains"])),
+    )
+    files = [
+        UploadedBytes(f"statement-{index}.pdf", make_pdf(PDF_PAGES, seed=index)),
+        UploadedBytes(f"transactions-{index}.csv", make_csv(CSV_ROWS, seed=index)),
+    ]
+
+    async def think() -> None:
+        if args.think:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+
+    started = time.perf_counter()
+    await engine.ingest(session, files)
+    stats["uploads"].append(time.perf_counter() - started)
+    prompts = USE_CASES[use_case]["locales"]["English"]["sample_prompts"] + FOLLOW_UPS
+    for turn in range(args.turns):
+        await think()
+        if turn and rng.random() < SLIDER_PROBABILITY:
+            stats["slider_moves"] += 1
+            if rng.random() < 0.5:
+                session.settings.creativity_level = round(rng.uniform(0.1, 0.9), 2)
+            else:
+                session.settings.risk_appetite = rng.randint(1, 5)
+        started = time.perf_counter()
+        result = await engine.send(session, prompts[turn % len(prompts)])
+        stats["turns"].append(time.perf_counter() - started)
+        stats["errors"] += result.error
+    stats["sessions"].append(session)
+
+
+async def run_level(sessions: int, args) -> dict:
+    engine = ChatEngine(
+        functools.partial(FakeGenaiClient, latency=args.latency, first_token_latency=args.first_token_latency),
+        caller=ResilientCaller(
+            max_attempts=GEMINI_MAX_ATTEMPTS,
+            deadline_seconds=GEMINI_DEADLINE_SECONDS,
+            max_concurrency=args.gemini_concurrency,
+            breaker=CircuitBreaker(
+                failure_threshold=GEMINI_BREAKER_THRESHOLD, reset_seconds=GEMINI_BREAKER_RESET_SECONDS
+            ),
+        ),
+        trace_directory=None,
+        max_workers=max(ENGINE_WORKERS, sessions),
+    )
+    warmup = {"uploads": [], "turns": [], "errors": 0, "slider_moves": 0, "sessions": []}
+    await session_flow(engine, -1, argparse.Namespace(**{**vars(args), "turns": 1, "think": 0}), warmup)
+    gc.collect()
+    memory_before = resident_mib()
+    cpu_before = time.process_time()
+    stats = {"uploads": [], "turns": [], "errors": 0, "slider_moves": 0, "sessions": []}
+    started = time.perf_counter()
+    await asyncio.gather(*(session_flow(engine, index, args, stats) for index in range(sessions)))
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    memory_after = resident_mib()
+    engine.close()
+    return {
+        "sessions": sessions,
+        "turns": len(stats["turns"]),
+        "errors": stats["errors"],
+        "slider_moves": stats["slider_moves"],
+        "wall_s": wall,
+        "turns_per_s": len(stats["turns"]) / wall,
+        "p50_ms": statistics.median(stats["turns"]) * 1000,
+        "p95_ms": percentile(stats["turns"], 0.95) * 1000,
+        "p99_ms": percentile(stats["turns"], 0.99) * 1000,
+        "upload_p50_ms": statistics.median(stats["uploads"]) * 1000,
+        "cpu_ms_per_session": cpu * 1000 / sessions,
+        "cpu_utilisation": cpu / wall,
+        "mib_per_session": (memory_after - memory_before) / sessions,
+        "rss_mib": memory_after,
+    }
+
+
+def measure_level(sessions: int, args) -> dict:
+    """Runs one level in a fresh interpreter so its CPU and memory figures start from a clean process."""
+    command = [sys.executable, "-m", "benchmarks.bench_load", "--single-level", str(sessions)]
+    for name in ("turns", "latency", "first_token_latency", "think", "gemini_concurrency"):
+        value = getattr(args, name)
+        if value is not None:
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def saturation(results: List[dict]) -> tuple:
+    """First level that no longer scales, with the reason; (None, "") when every level still scaled."""
+    baseline_p95 = results[0]["p95_ms"]
+    for previous, current in zip(results, results[1:]):
+        if current["turns_per_s"] < previous["turns_per_s"] * SCALING_FLOOR:
+            return current["sessions"], f"throughput grew less than {SCALING_FLOOR - 1:.0%} over {previous['sessions']}"
+        if current["p95_ms"] > baseline_p95 * LATENCY_CEILING:
+            return current["sessions"], f"p95 above {LATENCY_CEILING:g}x the single-session p95"
+    return None, ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=6, help="chat turns per session")
+    parser.add_argument("--latency", type=float, default=0.8, help="fake Gemini seconds per reply")
+    parser.add_argument("--first-token-latency", type=float, default=None, help="defaults to --latency")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between a session's actions")
+    parser.add_argument(
+        "--gemini-concurrency", type=int, default=GEMINI_MAX_CONCURRENCY, help="in-flight Gemini call cap"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--single-level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_level:
+        print(json.dumps(asyncio.run(run_level(args.single_level, args))))
+        return
+
+    levels = [int(level) for level in args.levels.split(",")]
+    print(
+        f"{args.turns} turns per session · fake Gemini {args.latency:g}s · think {args.think:g}s · "
+        f"Gemini cap {args.gemini_concurrency}"
+    )
+    header = (
+        f"{'sessions':>8} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'upload ms':>10} "
+        f"{'CPU ms/sess':>12} {'CPU %':>6} {'MiB/sess':>9} {'RSS MiB':>8} {'errors':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    results = []
+    for level in levels:
+        result = measure_level(level, args)
+        results.append(result)
+        print(
+            f"{result['sessions']:>8} {result['turns_per_s']:>8.2f} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+            f"{result['p99_ms']:>8.0f} {result['upload_p50_ms']:>10.0f} {result['cpu_ms_per_session']:>12.0f} "
+            f"{result['cpu_utilisation']:>6.0%} {result['mib_per_session']:>9.2f} {result['rss_mib']:>8.0f} "
+            f"{result['errors']:>7}"
+        )
+
+    saturated_at, reason = saturation(results)
+    if saturated_at is None:
+        print(f"\nNo saturation up to {levels[-1]} sessions.")
+    else:
+        print(f"\nSaturates at {saturated_at} concurrent sessions: {reason}.")
+
+    if args.json:
+        payload = {
+            "commit": git_commit(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("json", "single_level")},
+            "levels": results,
+            "saturated_at": saturated_at,
+        }
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Offline benchmarks for document extraction, ingestion, prompt assembly and the chat turn loop.
+
+Inputs are synthetic PDFs, CSV statements and PNG screenshots of increasing size; Gemini is replaced
+by ``FakeGenaiClient`` so runs need no network or API key. Each case reports p50/p95 latency,
+throughput and peak traced memory. Save a run with ``--json`` and diff a later run against it with
+``--compare`` to track regressions across commits.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --json before.json
+    python -m benchmarks.bench_pipeline --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.synthetic import UploadedBytes, make_csv, make_pdf, make_png
+from finance_chatbot.documents import build_retrieved_context, extract_text_from_file, prepare_documents
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.locales import DEFAULT_LANGUAGE, USE_CASE_ORDER
+from finance_chatbot.memory_store import MemoryStore
+from finance_chatbot.prompts import (
+    build_persona_prompt,
+    build_structured_prompt,
+    build_system_instruction,
+    render_memory,
+)
+
+PDF_PAGES = [1, 10, 50]
+CSV_ROWS = [1_000, 10_000, 100_000]
+IMAGE_SIZES = [(640, 480), (1920, 1080), (3840, 2160)]
+TURNS = 20
+RETRIEVAL_TOKEN_BUDGET = 1500
+QUESTIONS = [
+    "How much did I spend on groceries and dining last month?",
+    "I want to save USD 5,000 for an emergency fund within 12 months, I'm conservative.",
+    "Which subscriptions could I cancel to free up cash?",
+    "Is my rent above 30% of my salary?",
+]
+PERSONA = {
+    "use_case": USE_CASE_ORDER[0],
+    "tone": "Analytical",
+    "knowledge_domains": ["Budgeting", "Asset Allocation"],
+    "risk_band": 3,
+    "horizon": "Quarter",
+    "include_actions": True,
+    "include_disclaimer": True,
+    "creativity_level": 0.4,
+    "language": DEFAULT_LANGUAGE,
+}
+
+
+def measure(name: str, func: Callable[[], object], repeat: int, units: float = 1.0, unit: str = "ops") -> dict:
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cuts = statistics.quantiles(samples, n=20, method="inclusive") if len(samples) > 1 else samples * 19
+    p50 = statistics.median(samples)
+    return {
+        "case": name,
+        "runs": repeat,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(cuts[18] * 1000, 3),
+        "throughput": round(units / p50, 2) if p50 else 0.0,
+        "unit": f"{unit}/s",
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def extraction_cases(repeat: int) -> List[dict]:
+    results = []
+    for pages in PDF_PAGES:
+        data = make_pdf(pages)
+        upload = UploadedBytes(f"statement-{pages}p.pdf", data)
+        results.append(
+            measure(f"extract pdf {pages}p", lambda: extract_text_from_file(upload, max_chars=10**9), repeat, pages, "pages")
+        )
+    for rows in CSV_ROWS:
+        upload = UploadedBytes(f"statement-{rows}.csv", make_csv(rows))
+        results.append(measure(f"extract csv {rows} rows", lambda: extract_text_from_file(upload), repeat, rows, "rows"))
+    client = FakeGenaiClient()
+    for width, height in IMAGE_SIZES:
+        data = make_png(width, height)
+        upload = UploadedBytes(f"receipt-{width}x{height}.png", data)
+        results.append(
+            measure(
+                f"extract png {width}x{height}",
+                lambda: extract_text_from_file(upload, client),
+                repeat,
+                len(data) / 2**20,
+                "MiB",
+            )
+        )
+    return results
+
+
+def document_set(scale: int) -> list:
+    return [
+        UploadedBytes("statement.pdf", make_pdf(5 * scale)),
+        UploadedBytes("transactions.csv", make_csv(2_000 * scale)),
+        UploadedBytes("notes.txt", ("Monthly budget notes: rent, groceries, savings goal. " * 40 * scale).encode()),
+        UploadedBytes("receipt.png", make_png(800, 600)),
+    ]
+
+
+def ingestion_cases(repeat: int) -> List[dict]:
+    results = []
+    client = FakeGenaiClient()
+    for scale in (1, 4):
+        files = document_set(scale)
+        for indexed in (False, True):
+            label = "indexed" if indexed else "truncated"
+            results.append(
+                measure(
+                    f"prepare_documents x{scale} {label}",
+                    lambda: prepare_documents(files, client, index_documents=indexed),
+                    repeat,
+                    len(files),
+                    "files",
+                )
+            )
+    return results
+
+
+def prompt_cases(repeat: int) -> List[dict]:
+    documents, _ = prepare_documents(document_set(4), FakeGenaiClient(), index_documents=True)
+    memory = MemoryStore()
+    for question in QUESTIONS:
+        memory.observe(question)
+    memory_block = render_memory(memory, DEFAULT_LANGUAGE)
+    context = build_retrieved_context(documents, QUESTIONS[0], RETRIEVAL_TOKEN_BUDGET, DEFAULT_LANGUAGE)
+    return [
+        measure("build_persona_prompt", lambda: build_persona_prompt(**PERSONA), repeat * 20),
+        measure(
+            "build_retrieved_context",
+            lambda: build_retrieved_context(documents, QUESTIONS[0], RETRIEVAL_TOKEN_BUDGET, DEFAULT_LANGUAGE),
+            repeat,
+        ),
+        measure(
+            "build_structured_prompt",
+            lambda: build_structured_prompt(
+                persona_prompt=None,
+                user_message=QUESTIONS[0],
+                memory_block=memory_block,
+                documents=context,
+                language=DEFAULT_LANGUAGE,
+                include_response_format=False,
+            ),
+            repeat * 20,
+        ),
+    ]
+
+
+def turn_loop_case(repeat: int) -> dict:
+    documents, _ = prepare_documents(document_set(1), FakeGenaiClient(), index_documents=True)
+    client = FakeGenaiClient()
+
+    def consultation() -> None:
+        persona = build_persona_prompt(**PERSONA)
+        chat = client.chats.create(
+            model="bench", config={"system_instruction": build_system_instruction(persona, DEFAULT_LANGUAGE)}
+        )
+        memory = MemoryStore()
+        for turn in range(TURNS):
+            question = QUESTIONS[turn % len(QUESTIONS)]
+            memory.observe(question)
+            prompt = build_structured_prompt(
+                persona_prompt=None,
+                user_message=question,
+                memory_block=render_memory(memory, DEFAULT_LANGUAGE),
+                documents=build_retrieved_context(documents, question, RETRIEVAL_TOKEN_BUDGET, DEFAULT_LANGUAGE),
+                language=DEFAULT_LANGUAGE,
+                include_response_format=False,
+            )
+            chat.send_message(prompt)
+
+    return measure(f"turn loop {TURNS} turns", consultation, repeat, TURNS, "turns")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: List[dict], baseline: dict | None) -> None:
+    header = f"{'case':<34} {'p50 ms':>10} {'p95 ms':>10} {'throughput':>18} {'peak KiB':>10}"
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (
+            f"{result['case']:<34} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+            f"{result['throughput']:>11.1f} {result['unit']:<6} {result['peak_kib']:>10.1f}"
+        )
+        previous = baseline.get(result["case"]) if baseline else None
+        if previous:
+            line += f" {(result['p50_ms'] / previous['p50_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per case")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to diff against")
+    args = parser.parse_args()
+
+    results = extraction_cases(args.repeat) + ingestion_cases(args.repeat) + prompt_cases(args.repeat)
+    results.append(turn_loop_case(args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            previous = json.load(handle)
+        baseline = {item["case"]: item for item in previous["results"]}
+        print(f"Comparing against {previous['commit']} ({previous['recorded_at']})")
+    print_results(results, baseline)
+
+    if args.json:
+        payload = {
+            "commit": git_commit(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Token cost of carrying a conversation across a persona/profile change.
+
+Run from the repository root: python -m benchmarks.bench_profile_switch
+"""
+
+from finance_chatbot.conversation import compact_history, history_chars
+from finance_chatbot.fake_genai import FakeGenaiClient
+
+CHARS_PER_TOKEN = 4
+TURNS_BEFORE_SWITCH = [5, 20, 50]
+TURNS_AFTER_SWITCH = 5
+PERSONA = "Persona guideline sentence describing tone, risk posture and planning horizon. " * 14
+RESPONSE_FORMAT = "Response format: insight, numbered guidance, scenarios, resources, caveats. " * 3
+DOCUMENTS = "Reference documents supplied by the user:\n" + "2024-03-02 Grocery store purchase USD 54.20\n" * 140
+ANSWER = "Recommendation paragraph with a worked example and a short checklist. " * 13
+
+
+def tokens(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def user_message(turn: int) -> str:
+    return f"Question {turn}: how should I adjust my monthly budget after the rent increase?"
+
+
+def legacy_prompt(turn: int) -> str:
+    return "\n\n".join([PERSONA, DOCUMENTS, "User request:\n" + user_message(turn), RESPONSE_FORMAT])
+
+
+def compact_prompt(turn: int, first: bool) -> str:
+    sections = [DOCUMENTS] if first else []
+    return "\n\n".join(sections + ["User request:\n" + user_message(turn)])
+
+
+def request_chars(chat, system_instruction: str, message: str) -> int:
+    return len(system_instruction) + history_chars(chat.get_history()) + len(message)
+
+
+def run_turns(chat, system_instruction: str, prompts) -> int:
+    total = 0
+    for prompt in prompts:
+        total += request_chars(chat, system_instruction, prompt)
+        chat.send_message(prompt)
+    return total
+
+
+def build_session(client, turns: int, compact: bool):
+    system_instruction = PERSONA + "\n\n" + RESPONSE_FORMAT if compact else ""
+    chat = client.chats.create(model="bench", config={"system_instruction": system_instruction} if compact else None)
+    messages = []
+    for turn in range(turns):
+        prompt = compact_prompt(turn, turn == 0) if compact else legacy_prompt(turn)
+        chat.send_message(prompt)
+        messages += [{"role": "user", "content": user_message(turn)}, {"role": "assistant", "content": ANSWER}]
+    return chat, messages
+
+
+def main() -> None:
+    client = FakeGenaiClient(reply=lambda prompt: ANSWER)
+    system_instruction = PERSONA + "\n\n" + RESPONSE_FORMAT
+    header = f"{'turns':>6} {'strategy':<28} {'kept turns':>10} {'next request tok':>17} {f'next {TURNS_AFTER_SWITCH} turns tok':>18}"
+    print(header)
+    print("-" * len(header))
+    for turns in TURNS_BEFORE_SWITCH:
+        after = range(turns, turns + TURNS_AFTER_SWITCH)
+        legacy_chat, messages = build_session(client, turns, compact=False)
+        compact_chat, _ = build_session(client, turns, compact=True)
+        strategies = [
+            ("reset (drop history)", [], "", [legacy_prompt(turn) for turn in after]),
+            ("carry verbatim, full prompts", legacy_chat.get_history(), "", [legacy_prompt(turn) for turn in after]),
+            (
+                "carry verbatim, compact",
+                compact_chat.get_history(),
+                system_instruction,
+                [compact_prompt(turn, False) for turn in after],
+            ),
+            (
+                "compacted replay + new system",
+                compact_history(messages),
+                system_instruction,
+                [compact_prompt(turn, turn == turns) for turn in after],
+            ),
+        ]
+        for name, history, instruction, prompts in strategies:
+            chat = client.chats.create(model="bench", history=history or None)
+            next_request = request_chars(chat, instruction, prompts[0])
+            total = run_turns(chat, instruction, prompts)
+            print(f"{turns:>6} {name:<28} {len(history) // 2:>10} {tokens(next_request):>17} {tokens(total):>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Streamlit rerun duration on a long session: full-page reruns versus fragment-scoped ones.
+
+Drives the app through ``streamlit.testing.v1.AppTest`` with ``FakeGenaiClient`` standing in for Gemini and a
+transcript of ``--messages`` seeded messages, then times each interaction. ``AppTest`` keeps only the elements
+a run emitted, so "messages drawn" shows whether the transcript was re-rendered. The first row, a rerun with no
+widget change, is what every interaction cost before the page was split into fragments; pass ``--script`` with
+an older copy of the app to measure that version's interactions directly.
+
+Run from the repository root:
+    python -m benchmarks.bench_rerun
+    git show HEAD~1:finance_chatbot_app.py > /tmp/app_before.py
+    python -m benchmarks.bench_rerun --script /tmp/app_before.py
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from google import genai
+from streamlit.testing.v1 import AppTest
+
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.locales import DEFAULT_LANGUAGE, LANGUAGE_STRINGS
+
+APP_SCRIPT = Path(__file__).resolve().parent.parent / "finance_chatbot_app.py"
+ANSWER = "Here is a breakdown of your monthly budget with a few suggestions. " * 8
+
+
+def seeded_messages(count: int) -> List[dict]:
+    messages = []
+    for index in range(count):
+        if index % 2 == 0:
+            messages.append({"role": "user", "content": f"Question {index // 2}: how should I split my savings?"})
+            continue
+        stats = {"prompt_chars": 1200, "prompt_tokens": 300, "history_tokens": 40 * index, "tokens_saved": 0}
+        messages.append(
+            {
+                "role": "assistant",
+                "content": ANSWER,
+                "timing": {"first_token": 0.4, "total": 1.8},
+                "prompt_stats": stats,
+                "error": False,
+            }
+        )
+    return messages
+
+
+def slider(app: AppTest, label_key: str):
+    label = LANGUAGE_STRINGS[DEFAULT_LANGUAGE][label_key]
+    return next(widget for widget in app.sidebar.slider if widget.label == label)
+
+
+def start_session(script: Path, messages: int) -> AppTest:
+    app = AppTest.from_file(str(script), default_timeout=120)
+    app.run()
+    app.sidebar.text_input[0].input("offline-benchmark-key").run()
+    if "chat_session" in app.session_state:
+        app.session_state["chat_session"].messages = seeded_messages(messages)
+    else:  # apps from before the headless engine kept the transcript in session state directly
+        app.session_state["messages"] = seeded_messages(messages)
+    app.run()
+    return app
+
+
+def measure(app: AppTest, name: str, interact: Callable[[int], AppTest], repeat: int) -> dict:
+    samples = []
+    drawn = 0
+    for attempt in range(repeat):
+        started = time.perf_counter()
+        interact(attempt).run()
+        samples.append((time.perf_counter() - started) * 1000)
+        drawn = len(app.chat_message)
+        app.run()  # restore the full element tree before the next lookup
+    samples.sort()
+    return {
+        "case": name,
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        "drawn": drawn,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=str(APP_SCRIPT), help="app script to drive")
+    parser.add_argument("--messages", type=int, default=200, help="seeded transcript length")
+    parser.add_argument("--repeat", type=int, default=15, help="timed reruns per interaction")
+    args = parser.parse_args()
+
+    genai.Client = FakeGenaiClient
+    app = start_session(Path(args.script), args.messages)
+    cases = [
+        measure(app, "full page rerun", lambda attempt: app, args.repeat),
+        measure(
+            app,
+            "creativity slider",
+            lambda attempt: slider(app, "creativity_label").set_value(0.4 + 0.05 * (attempt % 2 + 1)),
+            args.repeat,
+        ),
+        measure(
+            app,
+            "risk slider",
+            lambda attempt: slider(app, "risk_label").set_value(2 + attempt % 3),
+            args.repeat,
+        ),
+        measure(
+            app,
+            "history budget slider",
+            lambda attempt: slider(app, "history_budget_label").set_value(9000 + 1000 * (attempt % 2)),
+            args.repeat,
+        ),
+    ]
+
+    print(f"{args.script} · {args.messages} messages · {args.repeat} reruns per case")
+    header = f"{'interaction':<24} {'p50 ms':>10} {'p95 ms':>10} {'messages drawn':>15}"
+    print(header)
+    print("-" * len(header))
+    for case in cases:
+        print(f"{case['case']:<24} {case['p50_ms']:>10.1f} {case['p95_ms']:>10.1f} {case['drawn']:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Hit rate and Gemini time saved by the response cache on a replayed FAQ workload.
+
+Each simulated user opens their own ``ChatEngine`` session under their own API key and playbook, so cache scopes
+are built exactly as in the app: settings, documents, remembered facts and conversation history. The opening
+question is one of the playbook's sample prompts as typed by that user: an exact repeat, a case and punctuation
+change, a small rewording, the same question with a different amount (which must not hit), or a one-off carrying a
+unique account number. Some users then ask follow-ups, which only hit when the whole conversation before them
+matches. Every miss is answered by ``FakeGenaiClient``; every hit saves the modelled Gemini turn time. Each
+similarity threshold replays the same users against a fresh engine.
+
+Run from the repository root: python -m benchmarks.bench_response_cache
+"""
+
+import functools
+import itertools
+import random
+import statistics
+from typing import List, Tuple
+
+from finance_chatbot.engine import ChatEngine, ChatSettings
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.locales import USE_CASE_ORDER, USE_CASES
+from finance_chatbot.response_cache import ResponseCache, normalize_prompt, numbers
+
+QUESTIONS = 400
+FOLLOW_UP_PROBABILITY = 0.4
+FOLLOW_UPS = [
+    "Can you break that down week by week?",
+    "What if I can only manage half of that?",
+    "Which step should I start with?",
+]
+GEMINI_TURN_SECONDS = 2.5
+THRESHOLDS = [1.0, 0.95, 0.9, 0.85]
+REWORDINGS = [
+    (" last week", " this past week"),
+    ("Help me", "Please help me"),
+    ("fees", "fee"),
+    ("should I", "do I"),
+    ("Walk me through", "Show me"),
+]
+
+
+def variants(prompt: str, rng: random.Random) -> Tuple[str, str]:
+    """Returns a typed variant of ``prompt`` and how it was changed."""
+    roll = rng.random()
+    if roll < 0.35:
+        return prompt, "repeat"
+    if roll < 0.6:
+        return prompt.lower().rstrip(".?!"), "case/punctuation"
+    if roll < 0.8:
+        for old, new in rng.sample(REWORDINGS, len(REWORDINGS)):
+            if old in prompt:
+                return prompt.replace(old, new, 1), "reworded"
+        return prompt.upper(), "case/punctuation"
+    if roll < 0.9 and any(character.isdigit() for character in prompt):
+        digit = next(character for character in prompt if character.isdigit())
+        return prompt.replace(digit, str((int(digit) + 1) % 10), 1), "different amount"
+    return f"{prompt} My account number ends in {rng.randrange(1000, 9999)}.", "one-off"
+
+
+def workload(seed: int = 11) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """One entry per simulated user: their playbook and the (typed question, kind) turns of their session."""
+    rng = random.Random(seed)
+    users = []
+    asked = 0
+    while asked < QUESTIONS:
+        use_case = rng.choice(USE_CASE_ORDER)
+        prompt = rng.choice(USE_CASES[use_case]["locales"]["English"]["sample_prompts"])
+        turns = [variants(prompt, rng)]
+        while rng.random() < FOLLOW_UP_PROBABILITY and asked + len(turns) < QUESTIONS:
+            turns.append((rng.choice(FOLLOW_UPS), "follow-up"))
+        users.append((use_case, turns))
+        asked += len(turns)
+    return users
+
+
+def replay(threshold: float, users: List[Tuple[str, List[Tuple[str, str]]]]) -> dict:
+    answers = itertools.count(1)
+    engine = ChatEngine(
+        functools.partial(FakeGenaiClient, reply=lambda prompt: f"Answer #{next(answers)}"),
+        response_cache=ResponseCache(max_entries=512, ttl_seconds=3600, similarity=threshold),
+        trace_directory=None,
+    )
+    asked_by = {}
+    lookups = []
+    wrong = 0
+    calls = 0
+    for number, (use_case, turns) in enumerate(users):
+        settings = ChatSettings(
+            use_case=use_case,
+            knowledge_domains=list(USE_CASES[use_case]["default_domains"]),
+            response_cache_similarity=threshold,
+        )
+        session = engine.new_session(f"user-{number}", settings)
+        for typed, _ in turns:
+            result = engine.run_turn(session, typed)
+            if result.cached is None:
+                calls += 1
+                asked_by[result.answer] = typed
+                continue
+            lookups.append(result.timing["total"] * 1e6)
+            if numbers(normalize_prompt(typed)) != numbers(normalize_prompt(asked_by[result.answer])):
+                wrong += 1
+    engine.close()
+    stats = engine.response_cache.stats()
+    return {
+        "threshold": threshold,
+        "stats": stats,
+        "gemini_calls": calls,
+        "saved_seconds": stats["hits"] * GEMINI_TURN_SECONDS,
+        "wrong_amount_hits": wrong,
+        "lookup_us": statistics.median(lookups) if lookups else 0.0,
+    }
+
+
+def main() -> None:
+    users = workload()
+    kinds = {}
+    for _, turns in users:
+        for _, kind in turns:
+            kinds[kind] = kinds.get(kind, 0) + 1
+    print(
+        f"{QUESTIONS} questions from {len(users)} users: "
+        + ", ".join(f"{count} {kind}" for kind, count in sorted(kinds.items()))
+    )
+    header = (
+        f"{'threshold':>9} {'hit rate':>9} {'exact':>6} {'similar':>8} {'Gemini calls':>13} "
+        f"{'saved s':>9} {'hit µs':>10} {'wrong-amount hits':>18}"
+    )
+    print(header)
+    print("-" * len(header))
+    for threshold in THRESHOLDS:
+        result = replay(threshold, users)
+        stats = result["stats"]
+        print(
+            f"{threshold:>9.2f} {stats['hit_rate']:>9.1%} {stats['exact_hits']:>6} {stats['similar_hits']:>8} "
+            f"{result['gemini_calls']:>13} {result['saved_seconds']:>9.1f} {result['lookup_us']:>10.1f} "
+            f"{result['wrong_amount_hits']:>18}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare prompt size and latency of retrieval against first-N-characters truncation.
+
+Run from the repository root: python -m benchmarks.bench_retrieval
+"""
+
+import random
+import statistics
+import time
+
+from finance_chatbot.document_index import BM25Index, build_chunks, select_within_budget
+
+MAX_DOCUMENT_CHARS = 6000
+CHARS_PER_TOKEN = 4
+TOKEN_BUDGET = 1500
+TOP_K = 8
+DOCUMENT_SIZES = [6_000, 50_000, 200_000]
+QUERIES = [
+    ("Why was I charged an overdraft fee?", "Overdraft fee"),
+    ("How much did I pay for the Tokyo hotel booking?", "Tokyo hotel"),
+    ("What is my monthly mortgage instalment?", "Mortgage instalment"),
+]
+MERCHANTS = ["Coffee shop", "Grocery store", "Fuel station", "Streaming service", "Pharmacy", "Bookstore"]
+
+
+def synthetic_statement(size: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size:
+        line = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.choice(MERCHANTS)} purchase USD {rng.uniform(2, 180):.2f}"
+        lines.append(line)
+        total += len(line) + 1
+    facts = [
+        "Overdraft fee charged USD 35.00 after balance fell below zero",
+        "Tokyo hotel booking deposit USD 412.80",
+        "Mortgage instalment paid USD 1,284.17",
+    ]
+    for position, fact in zip((0.35, 0.6, 0.9), facts):
+        lines.insert(int(len(lines) * position), fact)
+    return "\n".join(lines)
+
+
+def timed(func, repeats: int = 20):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+
+def main() -> None:
+    header = f"{'doc chars':>10} {'mode':>10} {'prompt bytes':>13} {'build ms':>9} {'query ms':>9} {'facts found':>12}"
+    print(header)
+    print("-" * len(header))
+    for size in DOCUMENT_SIZES:
+        text = synthetic_statement(size)
+
+        truncated, truncate_ms = timed(lambda: text[:MAX_DOCUMENT_CHARS])
+        truncate_bytes = len(truncated.encode("utf-8")) * len(QUERIES)
+        truncate_found = sum(marker in truncated for _, marker in QUERIES)
+        print(f"{size:>10} {'truncate':>10} {truncate_bytes:>13} {0.0:>9.2f} {truncate_ms:>9.3f} {truncate_found:>9}/{len(QUERIES)}")
+
+        chunks, build_ms = timed(lambda: build_chunks(text), repeats=5)
+        index = BM25Index([("statement.pdf", chunks)])
+        retrieval_bytes = 0
+        retrieval_found = 0
+        query_samples = []
+        for query, marker in QUERIES:
+            selected, query_ms = timed(
+                lambda: select_within_budget(index.search(query, TOP_K), TOKEN_BUDGET * CHARS_PER_TOKEN)
+            )
+            query_samples.append(query_ms)
+            excerpt = "\n\n".join(item.chunk.text for item in selected)
+            retrieval_bytes += len(excerpt.encode("utf-8"))
+            retrieval_found += marker in excerpt
+        print(
+            f"{size:>10} {'retrieval':>10} {retrieval_bytes:>13} {build_ms:>9.2f} "
+            f"{statistics.median(query_samples):>9.3f} {retrieval_found:>9}/{len(QUERIES)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
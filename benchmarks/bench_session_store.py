@@ -0,0 +1,178 @@
+"""Memory held by idle sessions with and without the SQLite session store, and the cost of resuming one.
+
+Each simulated session uploads its own PDF statement and CSV export, sends ``--turns`` turns to
+``FakeGenaiClient`` and then goes idle, the way browser tabs are left open. Without a store the process keeps
+every transcript, extracted document and live chat in memory for as long as the tab lives. With the store,
+idle sessions are unloaded and reload from SQLite on their next turn. Memory is the Python heap held by the
+sessions as traced by ``tracemalloc``; resident set size would hide the release, since CPython rarely hands
+freed arenas back to the OS. Each mode runs in a fresh interpreter. The resume rows reopen the stored sessions
+from a new engine, as after a restart.
+
+Run from the repository root:
+    python -m benchmarks.bench_session_store
+    python -m benchmarks.bench_session_store --sessions 500 --pdf-pages 80
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_load import percentile
+from benchmarks.synthetic import UploadedBytes, make_csv, make_pdf
+from finance_chatbot.document_cache import DocumentCache
+from finance_chatbot.engine import ChatEngine, ChatSettings
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.session_store import SessionStore
+
+QUESTIONS = [
+    "How much did I spend on groceries and dining last month?",
+    "I want to save USD 5,000 within 12 months.",
+    "Which subscriptions could I cancel to free up cash?",
+    "Is my rent above 30% of my salary?",
+]
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_mode(mode: str, args) -> dict:
+    clock = ManualClock()
+    store = SessionStore(args.database) if mode != "memory" else None
+    # The process-wide document cache is bounded on its own; keep it out of the comparison.
+    engine = ChatEngine(
+        FakeGenaiClient,
+        document_cache=DocumentCache(max_chars=0),
+        trace_directory=None,
+        session_store=store,
+        clock=clock,
+    )
+    uploads = [
+        [
+            UploadedBytes(f"statement-{index}.pdf", make_pdf(args.pdf_pages, seed=index)),
+            UploadedBytes(f"transactions-{index}.csv", make_csv(2_000, seed=index)),
+        ]
+        for index in range(args.sessions)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    sessions = []
+    for files in uploads:
+        session = engine.new_session("bench-key", ChatSettings(use_response_cache=False))
+        engine.ingest_files(session, files)
+        for turn in range(args.turns):
+            engine.run_turn(session, QUESTIONS[turn % len(QUESTIONS)])
+        sessions.append(session)
+    gc.collect()
+    memory_active = tracemalloc.get_traced_memory()[0]
+    if store is not None:
+        clock.now += engine.session_idle_seconds
+        engine.evict_idle()
+    gc.collect()
+    memory_idle = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    result = {
+        "mode": mode,
+        "active_mib": memory_active / 2**20,
+        "idle_mib": memory_idle / 2**20,
+        "loaded": engine.session_stats()["loaded"],
+    }
+    if store is not None:
+        result["database_mib"] = os.path.getsize(args.database) / 2**20
+    engine.close()
+    return result
+
+
+def run_resume(args) -> dict:
+    """Reopens every stored session from a fresh engine, as after a restart."""
+    store = SessionStore(args.database)
+    engine = ChatEngine(FakeGenaiClient, trace_directory=None, session_store=store)
+    session_ids = store.session_ids()
+    opened, transcripts, documents, turns = [], [], [], []
+    for session_id in session_ids:
+        started = time.perf_counter()
+        session = engine.resume_session(session_id)
+        opened.append(time.perf_counter() - started)
+        session.api_key = "bench-key"
+        started = time.perf_counter()
+        session.messages
+        transcripts.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        session.uploaded_documents
+        documents.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        engine.run_turn(session, "And what about next month?")
+        turns.append(time.perf_counter() - started)
+    engine.close()
+    return {
+        name: {"p50_ms": statistics.median(samples) * 1000, "p95_ms": percentile(samples, 0.95) * 1000}
+        for name, samples in [
+            ("resume session", opened),
+            ("load transcript", transcripts),
+            ("load documents", documents),
+            ("first turn after resume", turns),
+        ]
+    }
+
+
+def child(args, *extra: str) -> dict:
+    command = [sys.executable, "-m", "benchmarks.bench_session_store", "--database", args.database, *extra]
+    for name in ("sessions", "turns", "pdf_pages"):
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    return json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="simulated browser sessions")
+    parser.add_argument("--turns", type=int, default=10, help="turns per session before it goes idle")
+    parser.add_argument("--pdf-pages", type=int, default=40, help="pages in each session's statement")
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=["memory", "store", "resume"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        result = run_resume(args) if args.mode == "resume" else run_mode(args.mode, args)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        args.database = os.path.join(directory, "sessions.db")
+        modes = [child(args, "--mode", "memory"), child(args, "--mode", "store")]
+        resume = child(args, "--mode", "resume")
+
+    print(f"{args.sessions} sessions · {args.turns} turns · {args.pdf_pages}-page PDF + 2,000-row CSV each")
+    header = (
+        f"{'mode':<28} {'active MiB':>11} {'idle MiB':>9} {'KiB/idle session':>17} {'still loaded':>13} "
+        f"{'database MiB':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+    labels = {"memory": "session_state only", "store": "SQLite store + idle unload"}
+    for result in modes:
+        database = f"{result['database_mib']:>13.1f}" if "database_mib" in result else f"{'-':>13}"
+        print(
+            f"{labels[result['mode']]:<28} {result['active_mib']:>11.1f} {result['idle_mib']:>9.1f} "
+            f"{result['idle_mib'] * 1024 / args.sessions:>17.1f} {result['loaded']:>13} {database}"
+        )
+    print()
+    header = f"{'after restart':<28} {'p50 ms':>10} {'p95 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, timing in resume.items():
+        print(f"{name:<28} {timing['p50_ms']:>10.2f} {timing['p95_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Cold-start import report: time spent importing each module the Streamlit app pulls in at startup.
+
+Each repeat starts a fresh interpreter with ``-X importtime`` and imports the app's top-level modules in the
+order ``finance_chatbot_app.py`` lists them, so every figure is the extra cost that import adds on top of the
+ones before it. SDKs the app now imports on first use (genai, PyPDF2, Pillow) are timed separately, each in
+its own fresh interpreter, to show what was moved off the cold path. The OS file cache is warm after the first
+repeat, so treat the figures as a lower bound for a brand-new container. Save a run with ``--json`` and diff a
+later run against it with ``--compare`` to track cold-start regressions.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --json startup.json
+    python -m benchmarks.bench_startup --compare startup.json
+"""
+
+import argparse
+import ast
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_pipeline import git_commit
+
+APP_SCRIPT = Path(__file__).resolve().parent.parent / "finance_chatbot_app.py"
+DEFERRED_MODULES = ["google.genai", "PyPDF2", "PIL.Image"]
+SLOWEST_SHOWN = 10
+
+
+def app_imports() -> List[tuple]:
+    """Top-level import statements of the app script in source order, each with the module names it loads."""
+    tree = ast.parse(APP_SCRIPT.read_text(encoding="utf-8"))
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            # ``from package import name`` may load a submodule; keep both so whichever is real gets reported.
+            modules = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        statements.append((ast.unparse(node), modules))
+    return statements
+
+
+def import_times(statements: List[str]) -> Dict[str, dict]:
+    """Runs one fresh interpreter; returns self/cumulative microseconds per module from ``-X importtime``."""
+    code = "\n".join(statements)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=APP_SCRIPT.parent,
+    )
+    timings: Dict[str, dict] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return timings
+
+
+def process_wall_ms(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=APP_SCRIPT.parent)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(repeat: int) -> dict:
+    statements = app_imports()
+    code = "\n".join(statement for statement, _ in statements)
+    cumulative: Dict[str, List[float]] = defaultdict(list)
+    self_time: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(repeat):
+        for name, timing in import_times([code]).items():
+            cumulative[name].append(timing["cumulative_us"] / 1000)
+            self_time[name].append(timing["self_us"] / 1000)
+
+    interpreter = statistics.median(process_wall_ms("pass") for _ in range(repeat))
+    startup = statistics.median(process_wall_ms(code) for _ in range(repeat))
+    deferred = {}
+    for module in DEFERRED_MODULES:
+        try:
+            deferred[module] = statistics.median(
+                import_times([f"import {module}"])[module]["cumulative_us"] / 1000 for _ in range(repeat)
+            )
+        except subprocess.CalledProcessError:
+            deferred[module] = None
+    slowest = sorted(self_time, key=lambda name: statistics.median(self_time[name]), reverse=True)[:SLOWEST_SHOWN]
+    return {
+        "app_imports_ms": {
+            module: statistics.median(cumulative[module])
+            for _, modules in statements
+            for module in modules
+            if module in cumulative
+        },
+        "slowest_self_ms": {name: statistics.median(self_time[name]) for name in slowest},
+        "deferred_ms": deferred,
+        "interpreter_ms": interpreter,
+        "startup_ms": startup,
+    }
+
+
+def print_section(title: str, rows: Dict[str, float | None], baseline: Dict[str, float] | None) -> None:
+    header = f"{title:<48} {'ms':>10}"
+    if baseline is not None:
+        header += f" {'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, value in rows.items():
+        if value is None:
+            print(f"{name:<48} {'missing':>10}")
+            continue
+        line = f"{name:<48} {value:>10.1f}"
+        previous = baseline.get(name) if baseline is not None else None
+        if previous:
+            line += f" {(value / previous - 1) * 100:>+9.1f}%"
+        print(line)
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to diff against")
+    args = parser.parse_args()
+
+    result = measure(args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            previous = json.load(handle)
+        baseline = previous["result"]
+        print(f"Comparing against {previous['commit']} ({previous['recorded_at']})")
+
+    def section(key: str) -> Dict[str, float] | None:
+        return baseline.get(key, {}) if baseline is not None else None
+
+    print_section("app import, incremental in source order", result["app_imports_ms"], section("app_imports_ms"))
+    print_section(f"slowest {SLOWEST_SHOWN} modules by self time", result["slowest_self_ms"], section("slowest_self_ms"))
+    print_section("deferred until first use, cold", result["deferred_ms"], section("deferred_ms"))
+    totals = {
+        "bare interpreter": result["interpreter_ms"],
+        "interpreter + app imports": result["startup_ms"],
+        "app imports only": result["startup_ms"] - result["interpreter_ms"],
+    }
+    base_totals = None
+    if baseline is not None:
+        base_totals = {
+            "bare interpreter": baseline["interpreter_ms"],
+            "interpreter + app imports": baseline["startup_ms"],
+            "app imports only": baseline["startup_ms"] - baseline["interpreter_ms"],
+        }
+    print_section("process wall time, median", totals, base_totals)
+
+    if args.json:
+        payload = {
+            "commit": git_commit(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "result": result,
+        }
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic PDFs, CSV statements and images for offline benchmarks."""
+
+import io
+import random
+import zlib
+from datetime import date, timedelta
+
+CATEGORIES = ["Groceries", "Rent", "Utilities", "Transport", "Dining", "Subscriptions", "Salary", "Insurance"]
+MERCHANTS = ["SuperMart", "City Housing", "PowerGrid", "MetroCard", "Cafe Nine", "StreamFlix", "Acme Corp", "SafeCover"]
+
+
+class UploadedBytes(io.BytesIO):
+    """Quacks like Streamlit's ``UploadedFile``: ``name`` plus ``read``/``seek``."""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+def statement_lines(rows: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    day = date(2024, 1, 1)
+    lines = []
+    for row in range(rows):
+        index = rng.randrange(len(CATEGORIES))
+        amount = 2500.0 if CATEGORIES[index] == "Salary" else -round(rng.uniform(3, 400), 2)
+        lines.append(f"{day.isoformat()},{MERCHANTS[index]} #{row % 97},{CATEGORIES[index]},{amount:.2f},USD")
+        day += timedelta(days=rng.random() < 0.3)
+    return lines
+
+
+def make_csv(rows: int, seed: int = 7) -> bytes:
+    return ("date,description,category,amount,currency\n" + "\n".join(statement_lines(rows, seed)) + "\n").encode()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 7) -> bytes:
+    """Builds a minimal text PDF (Helvetica, compressed content streams) that PyPDF2 can extract."""
+    lines = statement_lines(pages * lines_per_page, seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        body = lines[page * lines_per_page : (page + 1) * lines_per_page]
+        text = "BT /F1 9 Tf 40 800 Td 11 TL\n" + "\n".join(f"({_escape(line)}) '" for line in body) + "\nET"
+        stream = zlib.compress(text.encode("latin-1"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    output.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def make_png(width: int, height: int, seed: int = 7) -> bytes:
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for row in range(0, height, 24):
+        draw.text((10, row), " ".join(statement_lines(1, rng.randrange(10_000))), fill=(20, 20, 20))
+    for _ in range(max(1, width * height // 20_000)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle((x, y, x + 30, y + 12), fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def make_photo(width: int, height: int, seed: int = 7) -> bytes:
+    """A camera-like JPEG: smooth gradients plus sensor noise, saved at high quality like phone photos."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    base = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+    tint = Image.new("RGB", (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    image = Image.blend(base, tint, 0.5)
+    draw = ImageDraw.Draw(image)
+    left, top = rng.randrange(width // 4), rng.randrange(height // 4)
+    draw.rectangle((left, top, left + width // 2, top + height // 2), fill=(245, 245, 240))
+    for row in range(top + 40, top + height // 2 - 40, 60):
+        draw.rectangle((left + 40, row, left + 40 + rng.randrange(width // 8, width // 3), row + 24), fill=(30, 30, 30))
+    noise = Image.effect_noise((width, height), 40).convert("RGB")
+    image = Image.blend(image, noise, 0.25)
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=95)
+    return output.getvalue()
@@ -0,0 +1 @@
+"""Supporting modules for the Streamlit finance chatbot."""
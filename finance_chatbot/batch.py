@@ -0,0 +1,214 @@
+"""Batch consultations: runs a JSONL file of prompts and settings through the chat engine concurrently.
+
+Each input line is one single-turn consultation: ``prompt`` plus any ``ChatSettings`` fields to override, and an
+optional ``id`` (defaults to ``line-<n>``)::
+
+    {"id": "tokyo-risk5", "prompt": "Plan a 5-day Tokyo trip under $2,000 all-in.", "use_case": "travel_budget",
+     "language": "Indonesian", "risk_appetite": 5, "planning_horizon": "Quarter"}
+
+Results are appended to the output JSONL as each request finishes, so an interrupted run resumes where it
+stopped: ids already answered without an error are skipped. ``--offline`` answers with ``FakeGenaiClient``.
+
+Run from the repository root:
+    python -m finance_chatbot.batch --grid prompts.jsonl
+    python -m finance_chatbot.batch prompts.jsonl answers.jsonl --concurrency 8
+    python -m finance_chatbot.batch prompts.jsonl answers.jsonl --offline
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import fields
+from typing import Dict, List, Set
+
+from finance_chatbot.engine import ChatEngine, ChatSettings, gemini_client
+from finance_chatbot.fake_genai import FakeGenaiClient
+from finance_chatbot.locales import LANGUAGE_OPTIONS, USE_CASE_ORDER, USE_CASES
+from finance_chatbot.prompts import build_system_instruction, estimate_tokens
+
+SETTING_FIELDS = {item.name for item in fields(ChatSettings)}
+# Every request is scored on a fresh answer unless its line turns the cache back on.
+BATCH_DEFAULTS = {"use_response_cache": False}
+GRID_RISK_LEVELS = [1, 3, 5]
+GRID_HORIZONS = ["Immediate", "Quarter", "Multi-Year"]
+DEFAULT_CONCURRENCY = 8
+
+
+def load_requests(path: str) -> List[dict]:
+    requests = []
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record.get("prompt"), str) or not record["prompt"].strip():
+                raise ValueError(f"{path}:{number}: missing 'prompt'")
+            unknown = set(record) - SETTING_FIELDS - {"id", "prompt"}
+            if unknown:
+                raise ValueError(f"{path}:{number}: unknown settings {', '.join(sorted(unknown))}")
+            record.setdefault("id", f"line-{number}")
+            requests.append(record)
+    return requests
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids already answered in an earlier run; failed requests and a torn last line are retried."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not record.get("error"):
+                done.add(record["id"])
+    return done
+
+
+def ends_mid_line(path: str) -> bool:
+    """True when an interrupted run died while writing its last record."""
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        if not handle.tell():
+            return False
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) != b"\n"
+
+
+def grid_requests() -> List[dict]:
+    """Every playbook's sample prompts in every language across a spread of risk levels and horizons."""
+    requests = []
+    for use_case, language, risk, horizon in itertools.product(
+        USE_CASE_ORDER, LANGUAGE_OPTIONS, GRID_RISK_LEVELS, GRID_HORIZONS
+    ):
+        playbook = USE_CASES[use_case]
+        for index, prompt in enumerate(playbook["locales"][language]["sample_prompts"]):
+            requests.append(
+                {
+                    "id": f"{use_case}-{language[:2].lower()}-r{risk}-{horizon.lower()}-{index}",
+                    "prompt": prompt,
+                    "use_case": use_case,
+                    "knowledge_domains": list(playbook["default_domains"]),
+                    "language": language,
+                    "risk_appetite": risk,
+                    "planning_horizon": horizon,
+                }
+            )
+    return requests
+
+
+async def consult(engine: ChatEngine, api_key: str, request: dict) -> dict:
+    overrides = {key: value for key, value in request.items() if key in SETTING_FIELDS}
+    settings = ChatSettings(**{**BATCH_DEFAULTS, **overrides})
+    session = engine.new_session(api_key, settings)
+    started = time.perf_counter()
+    try:
+        result = await engine.send(session, request["prompt"])
+    except Exception as error:  # bad settings (unknown playbook, language, ...) fail this request only
+        return {
+            "id": request["id"],
+            "settings": overrides,
+            "prompt": request["prompt"],
+            "answer": "",
+            "error": f"{type(error).__name__}: {error}",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    prompt_stats = result.prompt_stats or {}
+    system_prompt = build_system_instruction(session.persona_prompt, settings.language) if settings.compact_context else ""
+    return {
+        "id": request["id"],
+        "settings": overrides,
+        "prompt": request["prompt"],
+        "answer": result.answer,
+        "error": result.answer if result.error else None,
+        "latency_ms": round(result.timing["total"] * 1000, 1),
+        "first_token_ms": round(result.timing["first_token"] * 1000, 1),
+        "system_tokens": estimate_tokens(system_prompt),
+        "prompt_tokens": prompt_stats.get("prompt_tokens", 0),
+        "response_tokens": estimate_tokens(result.answer),
+        "cached": result.cached["kind"] if result.cached else None,
+    }
+
+
+async def run_batch(engine: ChatEngine, api_key: str, requests: List[dict], output: str, concurrency: int) -> List[dict]:
+    """Runs at most ``concurrency`` consultations at once and appends each result as soon as it is ready."""
+    limit = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def worker(request: dict) -> None:
+        async with limit:
+            record = await consult(engine, api_key, request)
+        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        handle.flush()
+        results.append(record)
+        if len(results) % 25 == 0 or len(results) == len(requests):
+            print(f"{len(results)}/{len(requests)} done", file=sys.stderr)
+
+    with open(output, "a", encoding="utf-8") as handle:
+        if ends_mid_line(output):
+            handle.write("\n")
+        await asyncio.gather(*(worker(request) for request in requests))
+    return results
+
+
+def summarize(results: List[dict], skipped: int, wall_seconds: float) -> Dict[str, float]:
+    latencies = sorted(record["latency_ms"] for record in results)
+    cuts = statistics.quantiles(latencies, n=20, method="inclusive") if len(latencies) > 1 else latencies * 19
+    return {
+        "answered": sum(1 for record in results if not record["error"]),
+        "errors": sum(1 for record in results if record["error"]),
+        "skipped": skipped,
+        "wall_s": round(wall_seconds, 2),
+        "per_s": round(len(results) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else 0.0,
+        "p95_ms": round(cuts[18], 1) if latencies else 0.0,
+        "response_tokens": sum(record.get("response_tokens", 0) for record in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL of prompts and settings")
+    parser.add_argument("output", nargs="?", help="JSONL results file; appended to and used to resume")
+    parser.add_argument("--grid", action="store_true", help="write the playbook x language x risk x horizon grid to INPUT and exit")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="consultations in flight at once (Gemini calls are also capped by the engine)")
+    parser.add_argument("--offline", action="store_true", help="answer with the stub client instead of Gemini")
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="seconds per stub reply with --offline")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY", ""), help="defaults to $GOOGLE_API_KEY")
+    args = parser.parse_args()
+
+    if args.grid:
+        with open(args.input, "w", encoding="utf-8") as handle:
+            for request in grid_requests():
+                handle.write(json.dumps(request, ensure_ascii=False) + "\n")
+        return
+    if not args.output:
+        parser.error("output is required unless --grid is given")
+    if not args.offline and not args.api_key:
+        parser.error("set GOOGLE_API_KEY, pass --api-key, or use --offline")
+
+    requests = load_requests(args.input)
+    done = completed_ids(args.output)
+    pending = [request for request in requests if request["id"] not in done]
+    factory = functools.partial(FakeGenaiClient, latency=args.stub_latency) if args.offline else gemini_client
+    engine = ChatEngine(factory, trace_directory=None, max_workers=args.concurrency)
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_batch(engine, args.api_key or "offline", pending, args.output, args.concurrency))
+    except KeyboardInterrupt:
+        sys.exit(f"interrupted; rerun the same command to resume from {args.output}")
+    finally:
+        engine.close()
+    print(json.dumps(summarize(results, len(requests) - len(pending), time.perf_counter() - started)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Process-wide pool of Gemini clients keyed by a hash of the API key."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:24]
+
+
+class ClientPool:
+    """Reuses one client (and its HTTP connection pool) per API key.
+
+    Clients idle for longer than ``idle_seconds`` or beyond ``max_clients`` are dropped from the pool.
+    They are not closed, because chat objects created by a session may still reference them.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_clients: int = 32,
+        idle_seconds: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._factory = factory
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self._stats = {"created": 0, "reused": 0, "evicted": 0}
+
+    def acquire(self, api_key: str) -> Any:
+        pool_key = hash_api_key(api_key)
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            entry = self._clients.pop(pool_key, None)
+            if entry is not None:
+                client = entry[0]
+                self._stats["reused"] += 1
+            else:
+                client = self._factory(api_key)
+                self._stats["created"] += 1
+            self._clients[pool_key] = (client, now)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self._stats["evicted"] += 1
+            return client
+
+    def _evict_idle(self, now: float) -> None:
+        while self._clients:
+            pool_key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_seconds:
+                break
+            del self._clients[pool_key]
+            self._stats["evicted"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            acquisitions = self._stats["created"] + self._stats["reused"]
+            return {
+                **self._stats,
+                "clients": len(self._clients),
+                "reuse_ratio": round(self._stats["reused"] / acquisitions, 3) if acquisitions else 0.0,
+            }
@@ -0,0 +1,127 @@
+"""Helpers for carrying and compacting chat history between Gemini chat objects."""
+
+from typing import Callable, Iterable, List, Tuple
+
+
+def history_entry(role: str, text: str) -> dict:
+    return {"role": role, "parts": [{"text": text}]}
+
+
+def compact_history(messages: Iterable[dict]) -> List[dict]:
+    """Rebuild Gemini chat history from the transcript: raw user text and successful replies only."""
+    history = []
+    pending_user = None
+    for message in messages:
+        if message["role"] == "user":
+            pending_user = message["content"]
+        elif message["role"] == "assistant" and pending_user is not None:
+            if not message.get("error"):
+                history += [history_entry("user", pending_user), history_entry("model", message["content"])]
+            pending_user = None
+    return history
+
+
+def content_text(content) -> str:
+    parts = content.get("parts") if isinstance(content, dict) else getattr(content, "parts", None)
+    texts = []
+    for part in parts or []:
+        text = part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
+        if text:
+            texts.append(text)
+    return "".join(texts)
+
+
+def history_chars(history: Iterable) -> int:
+    return sum(len(content_text(content)) for content in history)
+
+
+DIGEST_INSTRUCTION = (
+    "You maintain a running digest of a financial consultation. Merge the existing digest with the new turns "
+    "into at most {max_words} words of bullet points. Keep goals, amounts, currencies, deadlines, risk preferences, "
+    "decisions and open questions; drop pleasantries. Write the digest in {language}."
+)
+DIGEST_OPENER = "Conversation digest of earlier turns (for context):"
+DIGEST_ACK = "Understood. I will use this digest as context for the rest of the consultation."
+# Share of the history budget the fallback digest may use when no summary could be made.
+LOCAL_DIGEST_BUDGET_SHARE = 0.5
+
+
+def build_history(messages: List[dict], digest: str, digest_upto: int) -> List[dict]:
+    history = []
+    if digest:
+        history += [history_entry("user", f"{DIGEST_OPENER}\n{digest}"), history_entry("model", DIGEST_ACK)]
+    return history + compact_history(messages[digest_upto:])
+
+
+def compaction_cutoff(messages: List[dict], start: int, keep_recent_turns: int) -> int:
+    user_positions = [index for index in range(start, len(messages)) if messages[index]["role"] == "user"]
+    if len(user_positions) <= keep_recent_turns:
+        return start
+    return user_positions[len(user_positions) - keep_recent_turns]
+
+
+def render_turns(messages: Iterable[dict], max_chars: int | None = None) -> str:
+    lines = []
+    for message in messages:
+        if message.get("error"):
+            continue
+        text = " ".join(message["content"].split())
+        if max_chars and len(text) > max_chars:
+            text = text[:max_chars].rstrip() + "…"
+        lines.append(f"{message['role']}: {text}")
+    return "\n".join(lines)
+
+
+def local_digest(digest: str, messages: List[dict], max_chars_per_message: int = 240, max_chars: int | None = None) -> str:
+    """Appends the turns verbatim (clipped); past ``max_chars`` the oldest lines are dropped."""
+    turns = render_turns(messages, max_chars_per_message)
+    combined = f"{digest}\n{turns}".strip() if digest else turns
+    if max_chars is None or len(combined) <= max_chars:
+        return combined
+    tail = combined[-max_chars:]
+    return tail[tail.find("\n") + 1 :] if "\n" in tail else tail
+
+
+class HistoryCompactor:
+    """Folds turns older than the most recent ``keep_recent_turns`` into a rolling digest once history exceeds the budget."""
+
+    def __init__(
+        self,
+        token_budget: int,
+        keep_recent_turns: int = 4,
+        summarize: Callable[[str], str] | None = None,
+        chars_per_token: int = 4,
+        digest_words: int = 250,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summarize = summarize
+        self.chars_per_token = chars_per_token
+        self.digest_words = digest_words
+
+    def tokens(self, history: Iterable) -> int:
+        return (history_chars(history) + self.chars_per_token - 1) // self.chars_per_token
+
+    def compact(self, messages: List[dict], digest: str, digest_upto: int, language: str) -> Tuple[str, int]:
+        cutoff = compaction_cutoff(messages, digest_upto, self.keep_recent_turns)
+        if cutoff <= digest_upto:
+            return digest, digest_upto
+        older = messages[digest_upto:cutoff]
+        new_digest = ""
+        if self.summarize is not None:
+            prompt = "\n\n".join(
+                [
+                    DIGEST_INSTRUCTION.format(max_words=self.digest_words, language=language),
+                    "Existing digest:\n" + (digest or "(none)"),
+                    "New turns:\n" + render_turns(older),
+                ]
+            )
+            try:
+                new_digest = (self.summarize(prompt) or "").strip()
+            except Exception:
+                new_digest = ""
+        if not new_digest:
+            # Without a summary (model down, breaker open) the digest must still fit the budget it enforces.
+            max_chars = int(self.token_budget * self.chars_per_token * LOCAL_DIGEST_BUDGET_SHARE)
+            new_digest = local_digest(digest, older, max_chars=max_chars)
+        return new_digest, cutoff
@@ -0,0 +1,321 @@
+"""One-pass, bounded-memory statistical digest of CSV exports."""
+
+import csv
+import io
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+SNIFF_BYTES = 8192
+MAX_TRACKED_VALUES = 2000
+TOP_VALUES = 5
+SAMPLE_ROWS = 5
+MAX_MONTHS = 24
+MAX_CELL_CHARS = 60
+NUMERIC_SHARE = 0.9
+NUMERIC_LEADS = frozenset("0123456789+-.($€£¥")
+DATE_SEPARATORS = frozenset("-/.")
+CURRENCY_LEADS = ("rp", "us", "id", "eu", "gb", "sg")
+AMOUNT_HINTS = ("amount", "amt", "value", "total", "debit", "credit", "jumlah", "nominal", "nilai")
+
+CURRENCY_NOISE = re.compile(r"[\s$€£¥]|^(?:rp\.?|usd|idr|eur|gbp|sgd)|(?:usd|idr|eur|gbp|sgd)$", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"^[+-]?\d[\d.,]*$")
+THOUSANDS_PATTERN = re.compile(r"^\d{1,3}(?:([.,])\d{3})(?:\1\d{3})*$")
+ISO_DATE = re.compile(r"^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})")
+DAY_FIRST_OR_MONTH_FIRST = re.compile(r"^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b")
+
+
+def parse_number(value: str) -> float | None:
+    text = value.strip()
+    negative = text.startswith("(") and text.endswith(")")
+    text = CURRENCY_NOISE.sub("", text.strip("()")).strip()
+    if text.endswith("-"):
+        negative, text = True, text[:-1]
+    if not text or not NUMBER_PATTERN.match(text):
+        return None
+    sign = "-" if text[0] == "-" else ""
+    digits = text.lstrip("+-")
+    if "," in digits and "." in digits:
+        decimal = "," if digits.rfind(",") > digits.rfind(".") else "."
+        digits = digits.replace("." if decimal == "," else ",", "").replace(",", ".")
+    elif THOUSANDS_PATTERN.match(digits):
+        digits = digits.replace(",", "").replace(".", "")
+    elif digits.count(",") == 1:
+        digits = digits.replace(",", ".")
+    elif digits.count(",") > 1 or digits.count(".") > 1:
+        return None
+    try:
+        number = float(sign + digits)
+    except ValueError:
+        return None
+    return -abs(number) if negative else number
+
+
+def parse_date_parts(value: str) -> Tuple[int, int, int] | None:
+    """Returns ``(year, first, second)``; the day/month order of non-ISO dates is settled per column later."""
+    text = value.strip()
+    match = ISO_DATE.match(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return (year, month, day) if 1 <= month <= 12 and 1 <= day <= 31 else None
+    match = DAY_FIRST_OR_MONTH_FIRST.match(text)
+    if match:
+        first, second, year = (int(part) for part in match.groups())
+        if 1 <= first <= 31 and 1 <= second <= 31 and min(first, second) <= 12:
+            return (year, -first, second)
+    return None
+
+
+def format_number(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+class ColumnStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.filled = 0
+        self.numbers = 0
+        self.dates = 0
+        self.total = 0.0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+        self.day_first = False
+        # Earliest/latest (year, month, day) under a month-first and a day-first reading of ambiguous dates.
+        self.date_range: Dict[bool, List[Tuple[int, int, int]]] = {}
+        self.values: Counter = Counter()
+        self.values_capped = False
+
+    def observe(self, value: str) -> Tuple[float | None, Tuple[int, int, int] | None]:
+        value = value.strip()
+        if not value:
+            return None, None
+        self.filled += 1
+        if value[0] not in NUMERIC_LEADS and value[:2].lower() not in CURRENCY_LEADS:
+            self.track(value[:MAX_CELL_CHARS])
+            return None, None
+        looks_like_date = len(value) >= 8 and (value[2] in DATE_SEPARATORS or value[4] in DATE_SEPARATORS)
+        parts = parse_date_parts(value) if looks_like_date else None
+        if parts is not None:
+            return None, self.observe_date(parts)
+        number = None
+        # "1.500" is read as a thousands-separated integer, like ``parse_number`` does; plain floats skip the regexes.
+        if "," not in value and value[-4:-3] != ".":
+            try:
+                number = float(value)
+            except ValueError:
+                pass
+        if number is None:
+            number = parse_number(value)
+        if number is not None:
+            self.numbers += 1
+            self.total += number
+            if self.minimum is None:
+                self.minimum = self.maximum = number
+            elif number < self.minimum:
+                self.minimum = number
+            elif number > self.maximum:
+                self.maximum = number
+            return number, None
+        parts = parse_date_parts(value)
+        if parts is not None:
+            return None, self.observe_date(parts)
+        self.track(value[:MAX_CELL_CHARS])
+        return None, None
+
+    def observe_date(self, parts: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        self.dates += 1
+        if parts[1] < 0 and -parts[1] > 12:
+            self.day_first = True
+        for day_first in (False, True):
+            ordered = self.ordered(parts, day_first)
+            bounds = self.date_range.get(day_first)
+            if bounds is None:
+                self.date_range[day_first] = [ordered, ordered]
+            elif ordered < bounds[0]:
+                bounds[0] = ordered
+            elif ordered > bounds[1]:
+                bounds[1] = ordered
+        return parts
+
+    @staticmethod
+    def ordered(parts: Tuple[int, int, int], day_first: bool) -> Tuple[int, int, int]:
+        year, first, second = parts
+        if first > 0:
+            return parts
+        return (year, second, -first) if day_first else (year, -first, second)
+
+    def track(self, value: str) -> None:
+        if value in self.values or len(self.values) < MAX_TRACKED_VALUES:
+            self.values[value] += 1
+            return
+        self.values_capped = True
+        # Keep the frequent half so the counter stays bounded on high-cardinality columns.
+        for key, _ in self.values.most_common()[MAX_TRACKED_VALUES // 2 :]:
+            del self.values[key]
+        self.values[value] += 1
+
+    @property
+    def kind(self) -> str:
+        if not self.filled:
+            return "empty"
+        if self.numbers >= NUMERIC_SHARE * self.filled:
+            return "number"
+        if self.dates >= NUMERIC_SHARE * self.filled:
+            return "date"
+        return "text"
+
+    def date_bounds(self) -> str:
+        first, last = self.date_range[self.day_first]
+        return "{:04d}-{:02d}-{:02d} to {:04d}-{:02d}-{:02d}".format(*first, *last)
+
+
+class CsvDigest:
+    """Accumulates per-column statistics and monthly in/out totals row by row."""
+
+    def __init__(self, header: List[str]):
+        self.header = [name.strip() or f"column {index + 1}" for index, name in enumerate(header)]
+        self.columns = [ColumnStats(name) for name in self.header]
+        self.rows = 0
+        self.ragged_rows = 0
+        self.samples: List[List[str]] = []
+        # Keyed by (date column, day-first reading, month, numeric column): ambiguous dates are counted under
+        # both readings until the column shows which one it uses.
+        self.monthly: Dict[Tuple[int, bool, Tuple[int, int], int], List[float]] = {}
+
+    def observe(self, row: List[str]) -> None:
+        self.rows += 1
+        if len(row) != len(self.columns):
+            self.ragged_rows += 1
+        if len(self.samples) < SAMPLE_ROWS:
+            self.samples.append([cell[:MAX_CELL_CHARS] for cell in row])
+        numbers = {}
+        dates = []
+        for index, (column, value) in enumerate(zip(self.columns, row)):
+            number, parts = column.observe(value)
+            if number is not None:
+                numbers[index] = number
+            elif parts is not None:
+                dates.append((index, parts))
+        if not dates or not numbers:
+            return
+        date_index, parts = dates[0]
+        for day_first in (False, True):
+            year, month, _ = ColumnStats.ordered(parts, day_first)
+            if not 1 <= month <= 12:
+                continue
+            for index, number in numbers.items():
+                totals = self.monthly.setdefault((date_index, day_first, (year, month), index), [0.0, 0.0])
+                totals[0 if number >= 0 else 1] += number
+
+    def amount_column(self) -> int | None:
+        numeric = [index for index, column in enumerate(self.columns) if column.kind == "number"]
+        for index in numeric:
+            if any(hint in self.header[index].lower() for hint in AMOUNT_HINTS):
+                return index
+        return numeric[0] if numeric else None
+
+    def date_column(self) -> int | None:
+        return next((index for index, column in enumerate(self.columns) if column.kind == "date"), None)
+
+    def monthly_totals(self) -> List[Tuple[str, float, float]]:
+        date_index, amount_index = self.date_column(), self.amount_column()
+        if date_index is None or amount_index is None:
+            return []
+        day_first = self.columns[date_index].day_first
+        months = sorted(
+            (month, totals)
+            for (index, reading, month, value_index), totals in self.monthly.items()
+            if index == date_index and reading == day_first and value_index == amount_index
+        )
+        return [(f"{year:04d}-{month:02d}", inflow, outflow) for (year, month), (inflow, outflow) in months]
+
+    def describe_column(self, column: ColumnStats) -> str:
+        kind = column.kind
+        line = f"- {column.name} ({kind}, {column.filled:,} filled)"
+        if kind == "number":
+            return (
+                f"{line}: sum {format_number(column.total)}; min {format_number(column.minimum)}; "
+                f"max {format_number(column.maximum)}; mean {format_number(column.total / column.numbers)}"
+            )
+        if kind == "date":
+            return f"{line}: {column.date_bounds()}"
+        if kind == "text" and column.values:
+            distinct = f"{len(column.values):,}{'+' if column.values_capped else ''} distinct"
+            top = ", ".join(f"{value} ({count:,})" for value, count in column.values.most_common(TOP_VALUES))
+            return f"{line}: {distinct}; top {top}"
+        return line
+
+    def render(self, delimiter: str) -> str:
+        lines = [f"CSV summary: {self.rows:,} rows x {len(self.columns)} columns (delimiter {delimiter!r})"]
+        if self.ragged_rows:
+            lines.append(f"Rows with a different column count: {self.ragged_rows:,}")
+        lines.append("Columns:")
+        lines.extend(self.describe_column(column) for column in self.columns)
+        monthly = self.monthly_totals()
+        if monthly:
+            amount = self.header[self.amount_column()]
+            date = self.header[self.date_column()]
+            lines.append(f"Monthly totals of {amount} by {date} (in / out / net):")
+            if len(monthly) > MAX_MONTHS:
+                lines.append(f"(earliest {len(monthly) - MAX_MONTHS} months omitted)")
+            for month, inflow, outflow in monthly[-MAX_MONTHS:]:
+                lines.append(
+                    f"{month}: {format_number(inflow)} / {format_number(outflow)} / {format_number(inflow + outflow)}"
+                )
+        if self.samples:
+            lines.append(f"First {len(self.samples)} rows:")
+            lines.append(",".join(self.header))
+            lines.extend(",".join(row) for row in self.samples)
+        return "\n".join(lines)
+
+
+def sniff_dialect(sample: str) -> Tuple[str, bool]:
+    try:
+        sniffer = csv.Sniffer()
+        dialect = sniffer.sniff(sample, delimiters=",;\t|")
+        delimiter = dialect.delimiter
+    except csv.Error:
+        delimiter = ","
+    try:
+        has_header = csv.Sniffer().has_header(sample)
+    except csv.Error:
+        has_header = True
+    return delimiter, has_header
+
+
+RowCallback = Callable[[List[str], List[str]], None]
+
+
+def summarize_rows(
+    rows: Iterable[List[str]], has_header: bool = True, on_row: RowCallback | None = None
+) -> CsvDigest | None:
+    digest = None
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        if digest is None:
+            if has_header:
+                digest = CsvDigest(row)
+                continue
+            digest = CsvDigest([f"column {index + 1}" for index in range(len(row))])
+        digest.observe(row)
+        if on_row is not None:
+            on_row(digest.header, row)
+    return digest
+
+
+def summarize_csv(data: bytes, on_row: RowCallback | None = None) -> Tuple[str, dict]:
+    """Streams ``data`` through ``csv.reader`` once; memory is bounded by the column count, not the row count.
+
+    ``on_row(header, row)`` sees every data row during the same pass.
+    """
+    sample = data[:SNIFF_BYTES].decode("utf-8", errors="ignore")
+    delimiter, has_header = sniff_dialect(sample)
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", errors="ignore", newline="")
+    try:
+        digest = summarize_rows(csv.reader(stream, delimiter=delimiter), has_header, on_row)
+    finally:
+        stream.detach()
+    if digest is None:
+        return "", {}
+    return digest.render(delimiter), {"rows_total": digest.rows, "columns_total": len(digest.columns)}
@@ -0,0 +1,64 @@
+"""Process-wide cache for text extracted from uploaded documents."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+def content_key(data: bytes, suffix: str, version: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{version}:{suffix}:{digest}"
+
+
+class DocumentCache:
+    """Thread-safe LRU keyed by content hash, bounded by entry count and stored characters."""
+
+    def __init__(self, max_entries: int = 256, max_chars: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_chars:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= previous[1]
+            self._entries[key] = (value, size)
+            self._chars += size
+            while self._entries and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._chars -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "chars": self._chars,
+            }
@@ -0,0 +1,125 @@
+"""BM25 retrieval over chunks of uploaded documents."""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 or token.isdigit()]
+
+
+def split_into_chunks(text: str, chunk_chars: int = 800, overlap_chars: int = 120) -> List[str]:
+    if len(text) <= chunk_chars:
+        return [text] if text.strip() else []
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            boundary = text.rfind("\n", start + chunk_chars // 2, end)
+            if boundary == -1:
+                boundary = text.rfind(" ", start + chunk_chars // 2, end)
+            if boundary != -1:
+                end = boundary
+        piece = text[start:end].strip()
+        if piece:
+            chunks.append(piece)
+        if end >= len(text):
+            break
+        next_start = end - overlap_chars
+        boundary = text.find("\n", next_start, end)
+        if boundary == -1:
+            boundary = text.find(" ", next_start, end)
+        if boundary != -1:
+            next_start = boundary + 1
+        start = max(next_start, start + 1)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    text: str
+    position: int
+    term_counts: Counter = field(repr=False)
+    length: int
+
+
+def build_chunks(text: str, chunk_chars: int = 800, overlap_chars: int = 120) -> List[Chunk]:
+    chunks = []
+    for position, piece in enumerate(split_into_chunks(text, chunk_chars, overlap_chars)):
+        tokens = tokenize(piece)
+        chunks.append(Chunk(text=piece, position=position, term_counts=Counter(tokens), length=len(tokens)))
+    return chunks
+
+
+@dataclass
+class RetrievedChunk:
+    document: str
+    chunk: Chunk
+    chunk_total: int
+    score: float
+
+
+class BM25Index:
+    """Okapi BM25 over pre-tokenised chunks from one or more documents."""
+
+    def __init__(self, documents: Iterable[Tuple[str, List[Chunk]]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._entries: List[Tuple[str, Chunk, int]] = []
+        self._document_frequency: Dict[str, int] = Counter()
+        for name, chunks in documents:
+            for chunk in chunks:
+                self._entries.append((name, chunk, len(chunks)))
+                self._document_frequency.update(chunk.term_counts.keys())
+        total_length = sum(chunk.length for _, chunk, _ in self._entries)
+        self._average_length = total_length / len(self._entries) if self._entries else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _idf(self, term: str) -> float:
+        frequency = self._document_frequency.get(term, 0)
+        return math.log(1 + (len(self._entries) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> List[RetrievedChunk]:
+        terms = [term for term in set(tokenize(query)) if term in self._document_frequency]
+        if not terms or not self._entries:
+            return []
+        weights = {term: self._idf(term) for term in terms}
+        scored = []
+        for name, chunk, chunk_total in self._entries:
+            norm = self.k1 * (1 - self.b + self.b * chunk.length / (self._average_length or 1))
+            score = 0.0
+            for term in terms:
+                count = chunk.term_counts.get(term)
+                if count:
+                    score += weights[term] * count * (self.k1 + 1) / (count + norm)
+            if score > 0:
+                scored.append(RetrievedChunk(document=name, chunk=chunk, chunk_total=chunk_total, score=score))
+        scored.sort(key=lambda item: item.score, reverse=True)
+        return scored[:top_k]
+
+    def leading_chunks(self, per_document: int = 1) -> List[RetrievedChunk]:
+        return [
+            RetrievedChunk(document=name, chunk=chunk, chunk_total=chunk_total, score=0.0)
+            for name, chunk, chunk_total in self._entries
+            if chunk.position < per_document
+        ]
+
+
+def select_within_budget(results: List[RetrievedChunk], max_chars: int) -> List[RetrievedChunk]:
+    selected = []
+    used = 0
+    for result in results:
+        if used + len(result.chunk.text) > max_chars:
+            continue
+        selected.append(result)
+        used += len(result.chunk.text)
+    selected.sort(key=lambda item: (item.document, item.chunk.position))
+    return selected
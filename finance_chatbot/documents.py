@@ -0,0 +1,471 @@
+"""Text extraction, ingestion and retrieval context for uploaded documents."""
+
+import base64
+import io
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from finance_chatbot.csv_digest import summarize_csv
+from finance_chatbot.document_cache import DocumentCache, content_key
+from finance_chatbot.document_index import BM25Index, build_chunks, select_within_budget
+from finance_chatbot.images import PreparedImage, find_duplicates, plan_batches, prepare_image
+from finance_chatbot.model_registry import ModelAvailabilityRegistry
+from finance_chatbot.prompts import CHARS_PER_TOKEN, tr
+from finance_chatbot.transactions import MIN_TRANSACTIONS, StatementParser, summarize_statement
+
+UPLOADABLE_TYPES = ["pdf", "txt", "md", "csv", "png", "jpg", "jpeg", "webp"]
+IMAGE_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+IMAGE_CAPTION_MODEL = "gemini-1.5-flash-latest"
+IMAGE_CAPTION_FALLBACK_MODEL = "gemini-1.5-pro-latest"
+MAX_DOCUMENT_CHARS = 6000
+DOCUMENT_PREVIEW_CHARS = 600
+EXTRACTOR_VERSION = "6"
+MAX_INDEXED_CHARS = 200_000
+RETRIEVAL_CHUNK_CHARS = 800
+RETRIEVAL_TOP_K = 8
+DOCUMENT_WORKERS = 4
+DOCUMENT_TIMEOUT_SECONDS = 60
+DOCUMENT_POLL_SECONDS = 0.2
+
+
+CAPTION_PROMPT = (
+    "Summarise this image focusing on financial data, text, or cues that could help a "
+    "financial advisor understand the user's situation. Respond with concise bullet "
+    "points and include any legible figures."
+)
+BATCH_CAPTION_PROMPT = (
+    "Summarise each of the {count} images below separately, focusing on financial data, text, or cues that could "
+    "help a financial advisor understand the user's situation. Start each summary with a line of the form "
+    "'Image <number>:' and follow it with concise bullet points including any legible figures."
+)
+BATCH_CAPTION_MARKER = re.compile(r"^[\s*#_]*Image\s+(\d+)\s*[:.)\-]?[*_]*\s*", re.IGNORECASE | re.MULTILINE)
+
+
+def caption_parts(images: List[Tuple[bytes, str]]) -> list:
+    if len(images) == 1:
+        data, mime_type = images[0]
+        return [
+            {"text": CAPTION_PROMPT},
+            {"inline_data": {"mime_type": mime_type, "data": base64.b64encode(data).decode("utf-8")}},
+        ]
+    parts: list = [{"text": BATCH_CAPTION_PROMPT.format(count=len(images))}]
+    for number, (data, mime_type) in enumerate(images, start=1):
+        parts.append({"text": f"Image {number}:"})
+        parts.append({"inline_data": {"mime_type": mime_type, "data": base64.b64encode(data).decode("utf-8")}})
+    return parts
+
+
+def split_batch_captions(summary: str, count: int) -> List[str] | None:
+    markers = list(BATCH_CAPTION_MARKER.finditer(summary))
+    if [int(match.group(1)) for match in markers] != list(range(1, count + 1)):
+        return None
+    bounds = [match.end() for match in markers] + [len(summary)]
+    starts = [match.start() for match in markers[1:]] + [len(summary)]
+    captions = [summary[bounds[index] : starts[index]].strip() for index in range(count)]
+    return captions if all(captions) else None
+
+
+def response_text(response) -> str:
+    if hasattr(response, "text") and response.text:
+        return response.text.strip()
+    for candidate in getattr(response, "candidates", None) or []:
+        content = getattr(candidate, "content", None)
+        parts = getattr(content, "parts", None) if content else None
+        if parts:
+            text_parts = [getattr(part, "text", "") for part in parts]
+            summary = "\n".join(p for p in text_parts if p)
+            if summary.strip():
+                return summary.strip()
+    return ""
+
+
+def describe_images(
+    client,
+    images: List[Tuple[bytes, str]],
+    model_hint: str | None = None,
+    registry: ModelAvailabilityRegistry | None = None,
+) -> Tuple[List[str], str | None]:
+    """Captions one image, or several in a single request; returns one caption per image."""
+    if client is None:
+        return [], "No Google client available to interpret the image."
+    parts = caption_parts(images)
+
+    model_sequence: list[str] = []
+    if IMAGE_CAPTION_MODEL:
+        model_sequence.append(IMAGE_CAPTION_MODEL)
+    if model_hint and model_hint not in model_sequence:
+        model_sequence.append(model_hint)
+    if IMAGE_CAPTION_FALLBACK_MODEL not in model_sequence:
+        model_sequence.append(IMAGE_CAPTION_FALLBACK_MODEL)
+    if registry is not None:
+        model_sequence = registry.order(model_sequence)
+
+    last_error: str | None = None
+    for model_name in model_sequence:
+        try:
+            response = client.models.generate_content(model=model_name, contents=[{"role": "user", "parts": parts}])
+            summary = response_text(response)
+            if summary:
+                if registry is not None:
+                    registry.record_success(model_name)
+                if len(images) == 1:
+                    return [summary], None
+                captions = split_batch_captions(summary, len(images))
+                if captions is None:
+                    return [], "Could not split the batched image captions."
+                return captions, None
+        except Exception as exc:
+            last_error = str(exc)
+            if "NOT_FOUND" not in last_error and "unsupported" not in last_error.lower():
+                return [], f"Could not interpret image: {exc}"
+            if registry is not None:
+                registry.record_failure(model_name, last_error)
+    if last_error:
+        return [], f"Could not interpret image: {last_error}"
+    return [], "Image analysis returned no text."
+
+
+def describe_image_bytes(
+    client,
+    data: bytes,
+    mime_type: str,
+    model_hint: str | None = None,
+    registry: ModelAvailabilityRegistry | None = None,
+) -> tuple[str, str | None]:
+    captions, error = describe_images(client, [(data, mime_type)], model_hint, registry)
+    return (captions[0] if captions else ""), error
+
+
+def truncate_text(text: str, max_chars: int) -> Tuple[str, bool]:
+    if len(text) <= max_chars:
+        return text, False
+    return text[:max_chars], True
+
+
+def read_pdf_text(reader, max_chars: int, details: dict) -> str:
+    """Pages up to ``max_chars`` of raw text; bank-statement rows are parsed from every page so totals cover the file.
+
+    Pages past the budget are only read while the pages so far look like a statement.
+    """
+    parser = StatementParser()
+    pages: List[str] = []
+    collected = 0
+    read = 0
+    for page in reader.pages:
+        if collected > max_chars and len(parser.table) < MIN_TRANSACTIONS:
+            break
+        page_text = page.extract_text() or ""
+        read += 1
+        for line in page_text.splitlines():
+            parser.feed_line(line)
+        if collected <= max_chars:
+            pages.append(page_text)
+            collected += len(page_text) + 1
+    text = statement_text("\n".join(pages), details, parser)
+    # Without a statement summary only the pages within the budget reach the model.
+    details.update(pages_read=read if "transactions_total" in details else len(pages), pages_total=len(reader.pages))
+    return text
+
+
+def read_uploaded_bytes(uploaded_file) -> Tuple[bytes, str | None]:
+    try:
+        data = uploaded_file.read()
+        uploaded_file.seek(0)
+    except Exception as exc:
+        return b"", f"Could not read file bytes: {exc}"
+    return data, None
+
+
+def statement_text(text: str, details: dict, parser: StatementParser | None = None) -> str:
+    """Replaces transaction lines with precomputed statement aggregates when the text looks like a statement.
+
+    ``parser`` may already hold every row of the file when ``text`` is only the part kept within budget.
+    """
+    if parser is None:
+        parser = StatementParser()
+        for line in text.splitlines():
+            parser.feed_line(line)
+    if not parser.resolve_signs():
+        # Totals with guessed directions would read as exact; the model is better off with the printed lines.
+        return text
+    statement = summarize_statement(parser.table)
+    if not statement:
+        return text
+    details["transactions_total"] = len(parser.table)
+    return statement + "\n\n" + "\n".join(parser.other_lines)
+
+
+def extract_text_from_file(
+    uploaded_file, client=None, model_hint: str | None = None, max_chars: int = MAX_DOCUMENT_CHARS
+) -> Tuple[str, bool, str | None]:
+    data, read_error = read_uploaded_bytes(uploaded_file)
+    if read_error:
+        return "", False, read_error
+    text, truncated, error, _ = extract_text_from_bytes(
+        data, Path(uploaded_file.name).suffix.lower(), client, model_hint, max_chars
+    )
+    return text, truncated, error
+
+
+def extract_text_from_bytes(
+    data: bytes,
+    suffix: str,
+    client=None,
+    model_hint: str | None = None,
+    max_chars: int = MAX_DOCUMENT_CHARS,
+    caption_registry: ModelAvailabilityRegistry | None = None,
+) -> Tuple[str, bool, str | None, dict]:
+    details: dict = {}
+    if not data:
+        return "", False, "File is empty.", details
+
+    try:
+        if suffix == ".pdf":
+            from PyPDF2 import PdfReader
+
+            text = read_pdf_text(PdfReader(io.BytesIO(data)), max_chars, details)
+        elif suffix in {".txt", ".md"}:
+            text = statement_text(data.decode("utf-8", errors="ignore"), details)
+        elif suffix == ".csv":
+            parser = StatementParser()
+            text, details = summarize_csv(data, parser.feed_row)
+            statement = summarize_statement(parser.table)
+            if statement:
+                details["transactions_total"] = len(parser.table)
+                text = statement + "\n\n" + text
+        elif suffix in IMAGE_TYPES:
+            image = prepare_image(data, IMAGE_TYPES[suffix])
+            started = time.perf_counter()
+            summary, image_error = describe_image_bytes(client, image.data, image.mime_type, model_hint, caption_registry)
+            if image_error:
+                return "", False, image_error, details
+            details = image_details(image, time.perf_counter() - started, 1)
+            text = summary
+        else:
+            return "", False, f"Unsupported file type: {suffix or 'unknown'}", details
+    except Exception as exc:
+        return "", False, f"Could not parse file: {exc}", details
+
+    cleaned = text.replace("\r\n", "\n").replace("\r", "\n").strip()
+    if not cleaned:
+        return "", False, "No readable text found in the file.", details
+
+    truncated_text, truncated = truncate_text(cleaned, max_chars)
+    if details.get("pages_read", 0) < details.get("pages_total", 0):
+        truncated = True
+    return truncated_text, truncated, None, details
+
+
+def image_details(image: PreparedImage, caption_seconds: float, batch_size: int) -> dict:
+    return {
+        "image_bytes": image.original_bytes,
+        "sent_bytes": image.sent_bytes,
+        "image_size": f"{image.width}x{image.height}" if image.width else "",
+        "caption_ms": round(caption_seconds * 1000, 1),
+        "caption_batch": batch_size,
+    }
+
+
+def ingest_document(
+    data: bytes,
+    suffix: str,
+    client,
+    model_hint: str | None,
+    max_chars: int,
+    index_documents: bool,
+    caption_registry: ModelAvailabilityRegistry | None = None,
+) -> Tuple[tuple | None, str | None]:
+    content, truncated, error, details = extract_text_from_bytes(
+        data, suffix, client, model_hint, max_chars, caption_registry
+    )
+    if error:
+        return None, error
+    chunks = build_chunks(content, RETRIEVAL_CHUNK_CHARS) if index_documents else None
+    return (content, truncated, details, chunks), None
+
+
+def ingest_image_batch(
+    images: List[PreparedImage],
+    client,
+    model_hint: str | None,
+    max_chars: int,
+    index_documents: bool,
+    caption_registry: ModelAvailabilityRegistry | None = None,
+) -> List[Tuple[tuple | None, str | None]]:
+    started = time.perf_counter()
+    captions, error = describe_images(
+        client, [(image.data, image.mime_type) for image in images], model_hint, caption_registry
+    )
+    if error and len(images) > 1:
+        # The model did not follow the per-image layout; caption each image on its own instead.
+        return [
+            result
+            for image in images
+            for result in ingest_image_batch([image], client, model_hint, max_chars, index_documents, caption_registry)
+        ]
+    if error:
+        return [(None, error)]
+    elapsed = time.perf_counter() - started
+    results = []
+    for image, caption in zip(images, captions):
+        content, truncated = truncate_text(caption.replace("\r\n", "\n").strip(), max_chars)
+        chunks = build_chunks(content, RETRIEVAL_CHUNK_CHARS) if index_documents else None
+        results.append(((content, truncated, image_details(image, elapsed, len(images)), chunks), None))
+    return results
+
+
+def prepare_documents(
+    files,
+    client,
+    model_hint: str | None = None,
+    cache: DocumentCache | None = None,
+    index_documents: bool = False,
+    max_workers: int = DOCUMENT_WORKERS,
+    timeout: float = DOCUMENT_TIMEOUT_SECONDS,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    caption_registry: ModelAvailabilityRegistry | None = None,
+) -> Tuple[List[dict], List[str]]:
+    max_chars = MAX_INDEXED_CHARS if index_documents else MAX_DOCUMENT_CHARS
+    extracted: List[tuple | None] = [None] * len(files)
+    failures: dict[int, str] = {}
+    # Added to the documents only: the cache entry is shared by every copy, the original included.
+    duplicate_of: dict[int, str] = {}
+    first_image: dict[str, int] = {}
+    pending: dict[int, Tuple[str, bytes, str]] = {}
+    for position, uploaded_file in enumerate(files):
+        data, error = read_uploaded_bytes(uploaded_file)
+        if error:
+            failures[position] = error
+            continue
+        suffix = Path(uploaded_file.name).suffix.lower()
+        key = content_key(data, suffix, f"{EXTRACTOR_VERSION}:{max_chars}")
+        if suffix in IMAGE_TYPES and first_image.setdefault(key, position) != position:
+            duplicate_of[position] = files[first_image[key]].name
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            extracted[position] = cached
+        else:
+            pending[position] = (key, data, suffix)
+
+    completed = len(files) - len(pending)
+    if pending:
+        # Each job covers one or more positions and returns one (result, error) pair per position.
+        jobs: List[Tuple[List[int], Callable[[], list]]] = []
+        image_positions = [position for position, (_, _, suffix) in pending.items() if suffix in IMAGE_TYPES]
+        if client is None:
+            image_positions = []
+        for position, (_, data, suffix) in pending.items():
+            if position not in image_positions:
+                jobs.append(
+                    (
+                        [position],
+                        lambda data=data, suffix=suffix: [
+                            ingest_document(data, suffix, client, model_hint, max_chars, index_documents, caption_registry)
+                        ],
+                    )
+                )
+
+        started_at: dict[int, float] = {}
+
+        def run(job: int):
+            started_at[job] = time.monotonic()
+            return jobs[job][1]()
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))), thread_name_prefix="ingest")
+        futures = {pool.submit(run, job): job for job in range(len(jobs))}
+        if image_positions:
+            # Images are normalised while the other documents are extracted, then deduplicated and batched.
+            images = list(
+                pool.map(
+                    lambda position: prepare_image(pending[position][1], IMAGE_TYPES[pending[position][2]]),
+                    image_positions,
+                )
+            )
+            canonical = find_duplicates(images)
+            for index, match in enumerate(canonical):
+                if match != index:
+                    duplicate_of.setdefault(image_positions[index], files[image_positions[match]].name)
+            uniques = [index for index, match in enumerate(canonical) if match == index]
+            for batch in plan_batches(uniques, images):
+                members = [index for index, match in enumerate(canonical) if match in batch]
+
+                def run_batch(batch=batch, members=members):
+                    outcomes = ingest_image_batch(
+                        [images[index] for index in batch], client, model_hint, max_chars, index_documents, caption_registry
+                    )
+                    by_index = dict(zip(batch, outcomes))
+                    return [by_index[canonical[index]] for index in members]
+
+                jobs.append(([image_positions[index] for index in members], run_batch))
+                futures[pool.submit(run, len(jobs) - 1)] = len(jobs) - 1
+        remaining = set(futures)
+        try:
+            while remaining:
+                done, remaining = wait(remaining, timeout=DOCUMENT_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in [f for f in remaining if now - started_at.get(futures[f], now) > timeout]:
+                    remaining.discard(future)
+                    for position in jobs[futures[future]][0]:
+                        failures[position] = f"Timed out after {timeout:.0f}s."
+                    done.add(future)
+                for future in done:
+                    positions = jobs[futures[future]][0]
+                    if positions[0] not in failures:
+                        try:
+                            outcomes = future.result()
+                        except Exception as exc:
+                            outcomes = [(None, f"Could not parse file: {exc}")] * len(positions)
+                        for position, (result, error) in zip(positions, outcomes):
+                            if error:
+                                failures[position] = error
+                            else:
+                                extracted[position] = result
+                                if cache is not None:
+                                    cache.put(pending[position][0], result, len(result[0]))
+                    completed += len(positions)
+                    if on_progress is not None:
+                        on_progress(completed, len(files), files[positions[-1]].name)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    documents = []
+    errors = []
+    for position, uploaded_file in enumerate(files):
+        if position in failures:
+            errors.append(f"{uploaded_file.name}: {failures[position]}")
+            continue
+        content, truncated, details, chunks = extracted[position]
+        preview, _ = truncate_text(content, DOCUMENT_PREVIEW_CHARS)
+        documents.append(
+            {
+                "name": uploaded_file.name,
+                "content": content,
+                "preview": preview,
+                "truncated": truncated,
+                "char_count": len(content),
+                "chunks": chunks,
+                **details,
+                **({"duplicate_of": duplicate_of[position]} if position in duplicate_of else {}),
+            }
+        )
+    return documents, errors
+
+
+def build_retrieved_context(documents: List[dict], query: str, token_budget: int, language: str) -> List[str]:
+    indexed = [(doc["name"], doc["chunks"]) for doc in documents if doc.get("chunks")]
+    if not indexed:
+        return []
+    index = BM25Index(indexed)
+    results = index.search(query, RETRIEVAL_TOP_K)
+    if not results:
+        results = index.leading_chunks()
+    selected = select_within_budget(results, token_budget * CHARS_PER_TOKEN)
+    return [
+        f"{tr('document_prefix', language)}: {item.document} · "
+        f"{tr('excerpt_label', language).format(position=item.chunk.position + 1, total=item.chunk_total)}"
+        f"{chr(10)}{item.chunk.text}"
+        for item in selected
+    ]
@@ -0,0 +1,699 @@
+"""Headless chat engine: the consultation turn pipeline with explicit session objects and an asyncio API.
+
+The Streamlit page is one client of ``ChatEngine``; batch jobs and load tests drive the same pipeline directly.
+Gemini calls are blocking, so the async methods run them on the engine's worker threads, and the
+``ResilientCaller`` shared by every session still bounds how many are in flight at once.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, AsyncIterator, Callable, List, Tuple
+
+from finance_chatbot.client_pool import ClientPool, hash_api_key
+from finance_chatbot.conversation import HistoryCompactor, build_history
+from finance_chatbot.document_cache import DocumentCache
+from finance_chatbot.documents import build_retrieved_context, prepare_documents
+from finance_chatbot.instrumentation import TraceWriter, TurnTrace
+from finance_chatbot.locales import DEFAULT_LANGUAGE, TIME_HORIZONS, USE_CASE_ORDER, USE_CASES
+from finance_chatbot.memory_store import MemoryStore
+from finance_chatbot.model_registry import ModelAvailabilityRegistry
+from finance_chatbot.prompts import (
+    CHARS_PER_TOKEN,
+    build_persona_prompt,
+    build_structured_prompt,
+    build_system_instruction,
+    estimate_tokens,
+    prompt_cache_info,
+    render_memory,
+    tr,
+)
+from finance_chatbot.resilience import CircuitBreaker, ResilientCaller, ResilientClient
+from finance_chatbot.response_cache import ResponseCache, documents_hash, history_hash, response_scope
+from finance_chatbot.session_store import SessionStore
+
+MODEL_OPTIONS = [
+    "gemini-2.5-flash",
+    "gemini-2.0-flash-exp",
+    "gemini-1.5-pro",
+]
+
+MODEL_STATUS_TTL_SECONDS = 900
+DOCUMENT_CACHE_MAX_ENTRIES = 256
+DOCUMENT_CACHE_MAX_CHARS = 16 * 1024 * 1024
+DEFAULT_RETRIEVAL_TOKEN_BUDGET = 1500
+RESPONSE_CACHE_MAX_ENTRIES = 512
+RESPONSE_CACHE_TTL_SECONDS = 3600
+DEFAULT_RESPONSE_CACHE_SIMILARITY = 0.9
+GEMINI_REQUEST_TIMEOUT_MS = 60_000
+GEMINI_DEADLINE_SECONDS = 120
+GEMINI_MAX_ATTEMPTS = 3
+GEMINI_MAX_CONCURRENCY = 16
+GEMINI_BREAKER_THRESHOLD = 5
+GEMINI_BREAKER_RESET_SECONDS = 30
+CLIENT_POOL_MAX_CLIENTS = 32
+CLIENT_POOL_IDLE_SECONDS = 900
+HISTORY_SUMMARY_MODEL = "gemini-2.5-flash"
+DEFAULT_HISTORY_TOKEN_BUDGET = 8000
+HISTORY_KEEP_RECENT_TURNS = 4
+MEMORY_CAPACITY = 12
+TRACE_DIRECTORY = os.environ.get("FINANCE_CHATBOT_TRACE_DIR", "traces")
+MAX_SESSION_TRACES = 50
+ENGINE_WORKERS = 32
+SESSION_DATABASE = os.environ.get("FINANCE_CHATBOT_SESSION_DB", "sessions.db")
+SESSION_IDLE_SECONDS = 600
+SESSION_EVICTION_INTERVAL_SECONDS = 60
+
+
+def gemini_client(api_key: str):
+    from google import genai
+
+    return genai.Client(api_key=api_key, http_options={"timeout": GEMINI_REQUEST_TIMEOUT_MS})
+
+
+@dataclass
+class ChatSettings:
+    """Everything the sidebar controls; ``profile_signature`` identifies the persona-relevant part."""
+
+    model: str = MODEL_OPTIONS[0]
+    use_case: str = USE_CASE_ORDER[0]
+    tone: str = "Conversational"
+    knowledge_domains: List[str] = field(default_factory=lambda: list(USE_CASES[USE_CASE_ORDER[0]]["default_domains"]))
+    risk_appetite: int = 3
+    planning_horizon: str = TIME_HORIZONS[2]
+    include_actions: bool = True
+    include_disclaimer: bool = True
+    creativity_level: float = 0.4
+    language: str = DEFAULT_LANGUAGE
+    enable_memory: bool = True
+    stream_responses: bool = True
+    keep_history: bool = True
+    history_token_budget: int = DEFAULT_HISTORY_TOKEN_BUDGET
+    compact_context: bool = True
+    use_retrieval: bool = True
+    retrieval_token_budget: int = DEFAULT_RETRIEVAL_TOKEN_BUDGET
+    use_response_cache: bool = True
+    response_cache_similarity: float = DEFAULT_RESPONSE_CACHE_SIMILARITY
+
+    def profile_signature(self) -> str:
+        return "|".join(
+            [
+                self.model,
+                self.use_case,
+                self.tone,
+                ",".join(sorted(self.knowledge_domains)),
+                str(self.risk_appetite),
+                self.planning_horizon,
+                str(self.include_actions),
+                str(self.include_disclaimer),
+                f"creativity={self.creativity_level:.2f}",
+                self.language,
+                f"compact={self.compact_context}",
+            ]
+        )
+
+    def persona_prompt(self) -> str:
+        return build_persona_prompt(
+            use_case=self.use_case,
+            tone=self.tone,
+            knowledge_domains=self.knowledge_domains,
+            risk_band=self.risk_appetite,
+            horizon=self.planning_horizon,
+            include_actions=self.include_actions,
+            include_disclaimer=self.include_disclaimer,
+            creativity_level=self.creativity_level,
+            language=self.language,
+        )
+
+
+@dataclass
+class ChatSession:
+    """One user's conversation: transcript, memory, documents and the live Gemini chat built from them.
+
+    With a ``store``, the transcript and documents are loaded on first access and can be released again while the
+    session is idle; everything else is small and stays in memory.
+    """
+
+    api_key: str = ""
+    settings: ChatSettings = field(default_factory=ChatSettings)
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    api_key_hash: str = ""
+    history_digest: dict = field(default_factory=lambda: {"text": "", "upto": 0})
+    memory_store: MemoryStore = field(default_factory=lambda: MemoryStore(capacity=MEMORY_CAPACITY))
+    document_errors: List[str] = field(default_factory=list)
+    traces: List[dict] = field(default_factory=list)
+    chat: Any = None
+    chat_config: dict | None = None
+    chat_signature: str | None = None
+    # The settings profile the conversation was last held under; "keep history" off resets only when it changes.
+    profile_signature: str | None = None
+    sent_context: dict = field(default_factory=dict)
+    persona_prompt: str = ""
+    store: SessionStore | None = field(default=None, repr=False, compare=False)
+    last_active: float = field(default_factory=time.monotonic, repr=False, compare=False)
+    turn_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+    _messages: List[dict] | None = field(default_factory=list, init=False, repr=False)
+    _documents: List[dict] | None = field(default_factory=list, init=False, repr=False)
+    # Transcript rows already in the store (0 = rewrite it) and whether the document set changed since the last save.
+    saved_messages: int = field(default=0, init=False, repr=False, compare=False)
+    documents_dirty: bool = field(default=False, init=False, repr=False, compare=False)
+
+    @property
+    def messages(self) -> List[dict]:
+        if self._messages is None:
+            self._messages = self.store.load_messages(self.session_id)
+            self.saved_messages = len(self._messages)
+        return self._messages
+
+    @messages.setter
+    def messages(self, messages: List[dict]) -> None:
+        self._messages = messages
+        self.saved_messages = 0
+
+    @property
+    def uploaded_documents(self) -> List[dict]:
+        if self._documents is None:
+            self._documents = self.store.load_documents(self.session_id)
+        return self._documents
+
+    @uploaded_documents.setter
+    def uploaded_documents(self, documents: List[dict]) -> None:
+        self._documents = documents
+        self.documents_dirty = True
+
+    def reset_conversation(self) -> None:
+        self.chat = None
+        self.messages = []
+        self.history_digest = {"text": "", "upto": 0}
+        self.memory_store = MemoryStore(capacity=MEMORY_CAPACITY)
+
+    def release(self) -> bool:
+        """Drops the transcript, documents and live chat if they are all saved; they reload on next access."""
+        if self.store is None or self.documents_dirty:
+            return False
+        if self._messages is not None and self.saved_messages != len(self._messages):
+            return False
+        released = self._messages is not None or self._documents is not None or self.chat is not None
+        self._messages = None
+        self._documents = None
+        self.chat = None
+        self.sent_context = {}
+        return released
+
+    def state(self) -> dict:
+        """The small, always-loaded part of the session as stored in the database."""
+        return {
+            "api_key_hash": self.api_key_hash,
+            "settings": asdict(self.settings),
+            "history_digest": self.history_digest,
+            "memory": self.memory_store.to_dict(),
+            "document_errors": self.document_errors,
+            "chat_signature": self.chat_signature,
+            "profile_signature": self.profile_signature,
+        }
+
+
+@dataclass
+class TurnResult:
+    answer: str
+    timing: dict
+    prompt_stats: dict | None = None
+    cached: dict | None = None
+    error: bool = False
+
+
+class ChatEngine:
+    """Shared, thread-safe resources (client pool, caches, request layer) plus the per-session turn pipeline."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], Any] = gemini_client,
+        *,
+        document_cache: DocumentCache | None = None,
+        caption_registry: ModelAvailabilityRegistry | None = None,
+        response_cache: ResponseCache | None = None,
+        caller: ResilientCaller | None = None,
+        trace_directory: str | None = TRACE_DIRECTORY,
+        max_workers: int = ENGINE_WORKERS,
+        session_store: SessionStore | None = None,
+        session_idle_seconds: float = SESSION_IDLE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.caller = caller or ResilientCaller(
+            max_attempts=GEMINI_MAX_ATTEMPTS,
+            deadline_seconds=GEMINI_DEADLINE_SECONDS,
+            max_concurrency=GEMINI_MAX_CONCURRENCY,
+            breaker=CircuitBreaker(
+                failure_threshold=GEMINI_BREAKER_THRESHOLD, reset_seconds=GEMINI_BREAKER_RESET_SECONDS
+            ),
+        )
+        self.client_pool = ClientPool(
+            lambda api_key: ResilientClient(client_factory(api_key=api_key), self.caller),
+            max_clients=CLIENT_POOL_MAX_CLIENTS,
+            idle_seconds=CLIENT_POOL_IDLE_SECONDS,
+        )
+        self.document_cache = document_cache or DocumentCache(
+            max_entries=DOCUMENT_CACHE_MAX_ENTRIES, max_chars=DOCUMENT_CACHE_MAX_CHARS
+        )
+        self.caption_registry = caption_registry or ModelAvailabilityRegistry(ttl_seconds=MODEL_STATUS_TTL_SECONDS)
+        self.response_cache = response_cache or ResponseCache(
+            max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+            similarity=DEFAULT_RESPONSE_CACHE_SIMILARITY,
+        )
+        self.trace_directory = trace_directory
+        self.session_store = session_store
+        self.session_idle_seconds = session_idle_seconds
+        self._clock = clock
+        # Keyed by object: two tabs may attach to the same session id, and both must stay evictable.
+        self._sessions: "weakref.WeakValueDictionary[int, ChatSession]" = weakref.WeakValueDictionary()
+        self._last_eviction = clock()
+        self.evictions = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-engine")
+
+    # --- Sessions ---
+    def new_session(self, api_key: str = "", settings: ChatSettings | None = None) -> ChatSession:
+        session = ChatSession(
+            api_key=api_key,
+            api_key_hash=hash_api_key(api_key) if api_key else "",
+            settings=settings or ChatSettings(),
+            store=self.session_store,
+        )
+        return self._register(session)
+
+    def resume_session(self, session_id: str) -> ChatSession | None:
+        """Reopens a stored session; its transcript and documents load when first used."""
+        state = self.session_store.load_state(session_id) if self.session_store and session_id else None
+        if state is None:
+            return None
+        known = {item.name for item in fields(ChatSettings)}
+        session = ChatSession(
+            settings=ChatSettings(**{key: value for key, value in state["settings"].items() if key in known}),
+            session_id=session_id,
+            api_key_hash=state["api_key_hash"],
+            history_digest=state["history_digest"],
+            memory_store=MemoryStore.from_dict(state["memory"]),
+            document_errors=state["document_errors"],
+            chat_signature=state["chat_signature"],
+            profile_signature=state.get("profile_signature"),
+            store=self.session_store,
+        )
+        session.release()
+        return self._register(session)
+
+    def save(self, session: ChatSession) -> None:
+        """Writes the session's unsaved changes; a no-op without a store."""
+        if self.session_store is None:
+            return
+        messages = session._messages
+        documents = session._documents if session.documents_dirty else None
+        self.session_store.save(
+            session.session_id, session.state(), messages, session.saved_messages if messages is not None else 0, documents
+        )
+        if messages is not None:
+            session.saved_messages = len(messages)
+        if documents is not None:
+            session.documents_dirty = False
+
+    def set_api_key(self, session: ChatSession, api_key: str) -> ChatSession:
+        """Returns the session to continue under ``api_key``: ``session`` itself, or a new one if the key differs.
+
+        The stored conversation is left untouched for its owner. A key change in the same tab carries the uploaded
+        documents over; a resumed link opened with another key starts empty, so the link alone exposes nothing.
+        """
+        key_hash = hash_api_key(api_key)
+        if session.api_key_hash and session.api_key_hash != key_hash:
+            fresh = self.new_session(api_key, session.settings)
+            if session.api_key:
+                fresh.uploaded_documents = list(session.uploaded_documents)
+                fresh.document_errors = list(session.document_errors)
+                self.save(fresh)
+            return fresh
+        session.api_key = api_key
+        session.api_key_hash = key_hash
+        return session
+
+    def reset(self, session: ChatSession) -> None:
+        session.reset_conversation()
+        session.uploaded_documents = []
+        session.document_errors = []
+        self.save(session)
+
+    def touch(self, session: ChatSession) -> None:
+        """Marks the session active and, at most once a minute, releases the heavy data of idle ones."""
+        now = self._clock()
+        session.last_active = now
+        if self.session_store is None or now - self._last_eviction < SESSION_EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = now
+        self.evict_idle()
+
+    def evict_idle(self) -> int:
+        now = self._clock()
+        released = 0
+        for session in list(self._sessions.values()):
+            if now - session.last_active >= self.session_idle_seconds and session.release():
+                released += 1
+        self.evictions += released
+        return released
+
+    def session_stats(self) -> dict:
+        sessions = list(self._sessions.values())
+        return {
+            "open": len(sessions),
+            "loaded": sum(1 for session in sessions if session._messages is not None or session._documents is not None),
+            "evictions": self.evictions,
+        }
+
+    def _register(self, session: ChatSession) -> ChatSession:
+        session.last_active = self._clock()
+        self._sessions[id(session)] = session
+        return session
+
+    def client(self, session: ChatSession):
+        return self.client_pool.acquire(session.api_key)
+
+    def record_trace(self, session: ChatSession, trace: TurnTrace, kind: str) -> dict:
+        trace.fields["kind"] = kind
+        trace.fields["turn"] = sum(1 for msg in session.messages if msg["role"] == "user")
+        latest_trace = trace.to_dict()
+        session.traces = (session.traces + [latest_trace])[-MAX_SESSION_TRACES:]
+        if self.trace_directory:
+            try:
+                TraceWriter(self.trace_directory, session.session_id).write(latest_trace)
+            except OSError:
+                pass
+        return latest_trace
+
+    # --- Chat lifecycle ---
+    def prepare_chat(self, session: ChatSession, trace: TurnTrace | None = None) -> str:
+        """Builds the persona and (re)creates the live chat when the settings that shape it changed."""
+        settings = session.settings
+        trace = trace or TurnTrace(session.session_id)
+        self.touch(session)
+        with trace.stage("build_persona_prompt") as persona_stage:
+            persona_hits = prompt_cache_info()["hits"]
+            persona_prompt = settings.persona_prompt()
+            persona_stage["chars"] = len(persona_prompt)
+            persona_stage["cached"] = prompt_cache_info()["hits"] > persona_hits
+        session.persona_prompt = persona_prompt
+
+        profile_signature = settings.profile_signature()
+        profile_changed = session.profile_signature not in (None, profile_signature)
+        if settings.keep_history:
+            chat_signature = "|".join(
+                [
+                    settings.model,
+                    f"compact={settings.compact_context}",
+                    # Stored with the session, so a digest that survives restarts, unlike the salted hash().
+                    hashlib.sha256(persona_prompt.encode("utf-8")).hexdigest() if settings.compact_context else "",
+                ]
+            )
+        else:
+            chat_signature = profile_signature
+
+        if session.chat is None or session.chat_signature != chat_signature:
+            chat_config = None
+            if settings.compact_context:
+                chat_config = {"system_instruction": build_system_instruction(persona_prompt, settings.language)}
+            # Toggling "keep history" itself, or a chat that was only released (idle eviction, restart), keeps the
+            # transcript.
+            if not settings.keep_history and profile_changed:
+                session.reset_conversation()
+            session.chat_config = chat_config
+            digest = session.history_digest
+            session.chat = self.client(session).chats.create(
+                model=settings.model,
+                config=chat_config,
+                history=build_history(session.messages, digest["text"], digest["upto"]) or None,
+            )
+            signature_changed = session.chat_signature != chat_signature
+            session.chat_signature = chat_signature
+            session.sent_context = {}
+        else:
+            signature_changed = False
+        if signature_changed or session.profile_signature != profile_signature:
+            session.profile_signature = profile_signature
+            self.save(session)
+        return persona_prompt
+
+    def rebuild_chat(self, session: ChatSession) -> List[dict]:
+        """Starts a new chat from the transcript, e.g. after compaction or a turn answered without Gemini."""
+        digest = session.history_digest
+        history = build_history(session.messages, digest["text"], digest["upto"])
+        session.chat = self.client(session).chats.create(
+            model=session.settings.model, config=session.chat_config, history=history
+        )
+        session.sent_context = {}
+        return history
+
+    def compact_history(self, session: ChatSession) -> Tuple[int, int]:
+        client = self.client(session)
+        token_budget = session.settings.history_token_budget
+        compactor = HistoryCompactor(
+            token_budget,
+            keep_recent_turns=HISTORY_KEEP_RECENT_TURNS,
+            summarize=lambda prompt: client.models.generate_content(model=HISTORY_SUMMARY_MODEL, contents=prompt).text,
+            chars_per_token=CHARS_PER_TOKEN,
+        )
+        tokens_before = compactor.tokens(session.chat.get_history())
+        if tokens_before <= token_budget:
+            return tokens_before, 0
+        digest = session.history_digest
+        text, upto = compactor.compact(session.messages, digest["text"], digest["upto"], session.settings.language)
+        if upto == digest["upto"]:
+            return tokens_before, 0
+        session.history_digest = {"text": text, "upto": upto}
+        history = self.rebuild_chat(session)
+        tokens_after = compactor.tokens(history)
+        return tokens_after, tokens_before - tokens_after
+
+    # --- Documents ---
+    def ingest_files(self, session: ChatSession, files: list, on_progress: Callable[[int, int, str], None] | None = None) -> dict:
+        """Extracts and indexes uploads into the session; traces the run when anything was not cached."""
+        trace = TurnTrace(session.session_id)
+        self.touch(session)
+        cache_before = self.document_cache.stats()
+        with trace.stage("document_ingestion", files=len(files)) as ingest_stage:
+            documents, doc_errors = prepare_documents(
+                files,
+                self.client(session),
+                session.settings.model,
+                cache=self.document_cache,
+                index_documents=session.settings.use_retrieval,
+                on_progress=on_progress,
+                caption_registry=self.caption_registry,
+            )
+            cache_after = self.document_cache.stats()
+            ingest_stage["cache_hits"] = cache_after["hits"] - cache_before["hits"]
+            ingest_stage["cache_misses"] = cache_after["misses"] - cache_before["misses"]
+            ingest_stage["errors"] = len(doc_errors)
+        # The uploader hands the same files back on every rerun; only a different set needs saving.
+        if documents_hash(documents) != documents_hash(session.uploaded_documents):
+            session.uploaded_documents = documents
+        session.document_errors = doc_errors
+        if ingest_stage["cache_misses"]:
+            self.record_trace(session, trace, "ingestion")
+        self.save(session)
+        return ingest_stage
+
+    def clear_documents(self, session: ChatSession) -> None:
+        session.uploaded_documents = []
+        session.document_errors = []
+        self.save(session)
+
+    # --- Turns ---
+    def run_turn(
+        self,
+        session: ChatSession,
+        prompt: str,
+        on_text: Callable[[str], None] | None = None,
+        trace: TurnTrace | None = None,
+    ) -> TurnResult:
+        """Answers one user message; ``on_text`` receives the reply so far while it streams."""
+        settings = session.settings
+        language = settings.language
+        trace = trace or TurnTrace(session.session_id)
+        self.touch(session)
+        if session.chat is None:
+            self.prepare_chat(session, trace)
+
+        if settings.enable_memory:
+            session.memory_store.observe(prompt)
+        memory_context = render_memory(session.memory_store, language) if settings.enable_memory else ""
+
+        cache_scope = None
+        cached = None
+        if settings.use_response_cache:
+            with trace.stage("response_cache") as cache_stage:
+                lookup_started = time.perf_counter()
+                digest = session.history_digest
+                cache_scope = response_scope(
+                    settings.profile_signature(),
+                    documents_hash(session.uploaded_documents),
+                    memory_context,
+                    history_hash(digest["text"], session.messages[digest["upto"] :]),
+                )
+                cached = self.response_cache.lookup(cache_scope, prompt, settings.response_cache_similarity)
+                lookup_seconds = time.perf_counter() - lookup_started
+                cache_stage.update(hit=cached is not None)
+                if cached:
+                    cache_stage.update(kind=cached.kind, similarity=round(cached.similarity, 3))
+
+        if cached:
+            session.messages.append({"role": "user", "content": prompt})
+            timing = {"first_token": lookup_seconds, "total": lookup_seconds}
+            cached_meta = {"kind": cached.kind, "similarity": cached.similarity, "saved": cached.saved_seconds - lookup_seconds}
+            session.messages.append(
+                {"role": "assistant", "content": cached.answer, "timing": timing, "cached": cached_meta, "error": False}
+            )
+            # The live chat never saw this exchange; rebuild it from the transcript so follow-ups have the context.
+            self.rebuild_chat(session)
+            self.record_trace(session, trace, "turn")
+            self.save(session)
+            return TurnResult(cached.answer, timing, cached=cached_meta)
+
+        with trace.stage("history_compaction") as compaction_stage:
+            history_tokens, tokens_saved = self.compact_history(session)
+            compaction_stage.update(history_tokens=history_tokens, tokens_saved=tokens_saved)
+        session.messages.append({"role": "user", "content": prompt})
+
+        if settings.use_retrieval:
+            with trace.stage("retrieval") as retrieval_stage:
+                document_context = build_retrieved_context(
+                    session.uploaded_documents, prompt, settings.retrieval_token_budget, language
+                )
+                retrieval_stage["excerpts"] = len(document_context)
+        else:
+            document_context = [
+                f"{tr('document_prefix', language)}: {doc['name']}"
+                f"{tr('truncated_suffix', language) if doc['truncated'] else ''}\n{doc['content']}"
+                for doc in session.uploaded_documents
+            ]
+
+        with trace.stage("build_structured_prompt") as prompt_stage:
+            pending_context = {}
+            if settings.compact_context:
+                sent_context = session.sent_context
+                documents_signature = hash(tuple(document_context))
+                documents_changed = sent_context.get("documents", hash(())) != documents_signature
+                memory_signature = hash(memory_context)
+                memory_changed = sent_context.get("memory", hash("")) != memory_signature
+                structured_prompt = build_structured_prompt(
+                    persona_prompt=None,
+                    user_message=prompt,
+                    memory_block=memory_context if memory_changed else "",
+                    documents=document_context if documents_changed else [],
+                    language=language,
+                    documents_cleared=documents_changed and not document_context,
+                    include_response_format=False,
+                )
+                pending_context = {"documents": documents_signature, "memory": memory_signature}
+            else:
+                structured_prompt = build_structured_prompt(
+                    persona_prompt=session.persona_prompt,
+                    user_message=prompt,
+                    memory_block=memory_context,
+                    documents=document_context,
+                    language=language,
+                )
+            prompt_stats = {
+                "prompt_chars": len(structured_prompt),
+                "prompt_tokens": estimate_tokens(structured_prompt),
+                "history_tokens": history_tokens,
+                "tokens_saved": tokens_saved,
+            }
+            prompt_stage.update(prompt_stats)
+
+        with trace.stage("send_message", streamed=settings.stream_responses) as send_stage:
+            turn_started = time.perf_counter()
+            first_token_at = None
+            try:
+                if settings.stream_responses:
+                    parts: List[str] = []
+                    for chunk in session.chat.send_message_stream(structured_prompt):
+                        text = getattr(chunk, "text", None)
+                        if not text:
+                            continue
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        parts.append(text)
+                        if on_text is not None:
+                            on_text("".join(parts))
+                    answer = "".join(parts)
+                else:
+                    response = session.chat.send_message(structured_prompt)
+                    answer = response.text if hasattr(response, "text") else str(response)
+                    first_token_at = time.perf_counter()
+                session.sent_context.update(pending_context)
+                answer_failed = False
+            except Exception as error:
+                answer = f"⚠️ Unable to complete the request: {error}"
+                answer_failed = True
+            turn_finished = time.perf_counter()
+            timing = {
+                "first_token": (first_token_at or turn_finished) - turn_started,
+                "total": turn_finished - turn_started,
+            }
+            send_stage.update(
+                first_token_ms=round(timing["first_token"] * 1000, 2),
+                response_chars=len(answer),
+                response_tokens=estimate_tokens(answer),
+                error=answer_failed,
+            )
+
+        if cache_scope and not answer_failed:
+            self.response_cache.store(cache_scope, prompt, answer, timing["total"])
+        session.messages.append(
+            {"role": "assistant", "content": answer, "timing": timing, "prompt_stats": prompt_stats, "error": answer_failed}
+        )
+        self.record_trace(session, trace, "turn")
+        self.save(session)
+        return TurnResult(answer, timing, prompt_stats, error=answer_failed)
+
+    # --- asyncio API ---
+    async def _in_worker(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def ingest(self, session: ChatSession, files: list) -> dict:
+        async with session.turn_lock:
+            return await self._in_worker(self.ingest_files, session, files)
+
+    async def send(self, session: ChatSession, prompt: str) -> TurnResult:
+        """Runs one turn off the event loop; turns of the same session are serialised, other sessions overlap."""
+        async with session.turn_lock:
+            return await self._in_worker(self._prepared_turn, session, prompt, None)
+
+    async def stream(self, session: ChatSession, prompt: str) -> AsyncIterator[str]:
+        """Yields the growing reply text as it streams; the finished turn is ``session.messages[-1]``."""
+        loop = asyncio.get_running_loop()
+        updates: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        def push(text: str) -> None:
+            loop.call_soon_threadsafe(updates.put_nowait, text)
+
+        async with session.turn_lock:
+            turn = asyncio.ensure_future(self._in_worker(self._prepared_turn, session, prompt, push))
+            turn.add_done_callback(lambda _: updates.put_nowait(finished))
+            while True:
+                text = await updates.get()
+                if text is finished:
+                    break
+                yield text
+            result = await turn
+            if result.cached or result.error or not session.settings.stream_responses:
+                yield result.answer
+
+    def _prepared_turn(self, session: ChatSession, prompt: str, on_text: Callable[[str], None] | None) -> TurnResult:
+        trace = TurnTrace(session.session_id)
+        self.prepare_chat(session, trace)
+        return self.run_turn(session, prompt, on_text, trace)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,134 @@
+"""Offline stand-in for ``google.genai.Client`` with configurable latency and failures."""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, List
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = None
+
+
+def default_reply(prompt: str) -> str:
+    request = prompt.rsplit("\n", 1)[-1].strip()[:120]
+    return (
+        f"**Executive insight:** offline reply to \"{request}\".\n\n"
+        "1. Review last month's spending against your plan.\n"
+        "2. Automate a transfer into savings on payday.\n"
+        "3. Revisit the plan in 30 days."
+    )
+
+
+class _FakeBackend:
+    def __init__(
+        self,
+        latency: float,
+        first_token_latency: float | None,
+        failures: Iterable[Exception | None],
+        reply,
+        chunk_chars: int,
+        seconds_per_mib: float = 0.0,
+    ):
+        self.latency = latency
+        self.seconds_per_mib = seconds_per_mib
+        self.first_token_latency = latency if first_token_latency is None else first_token_latency
+        self.reply = reply
+        self.chunk_chars = chunk_chars
+        self.calls: List[dict] = []
+        self._failures = deque(failures)
+        self._lock = threading.Lock()
+
+    def begin(self, kind: str, model: str, payload) -> float:
+        """Records the call and returns the simulated upload time for its payload."""
+        chars = len(str(payload))
+        with self._lock:
+            self.calls.append({"kind": kind, "model": model, "chars": chars})
+            failure = self._failures.popleft() if self._failures else None
+        if failure is not None:
+            raise failure
+        return chars / 2**20 * self.seconds_per_mib
+
+
+class FakeChat:
+    def __init__(self, backend: _FakeBackend, model: str, config=None, history=None):
+        self._backend = backend
+        self.model = model
+        self.config = config
+        self._history = list(history or [])
+
+    def get_history(self, curated: bool = False) -> list:
+        return list(self._history)
+
+    def send_message(self, message, config=None) -> FakeResponse:
+        self._backend.begin("chat", self.model, message)
+        time.sleep(self._backend.latency)
+        text = self._backend.reply(str(message))
+        self._history += [{"role": "user", "parts": [{"text": str(message)}]}, {"role": "model", "parts": [{"text": text}]}]
+        return FakeResponse(text)
+
+    def send_message_stream(self, message, config=None) -> Iterator[FakeResponse]:
+        self._backend.begin("chat_stream", self.model, message)
+        text = self._backend.reply(str(message))
+        pieces = [text[i : i + self._backend.chunk_chars] for i in range(0, len(text), self._backend.chunk_chars)] or [""]
+        time.sleep(self._backend.first_token_latency)
+        step = max(0.0, self._backend.latency - self._backend.first_token_latency) / max(1, len(pieces) - 1)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(step)
+            yield FakeResponse(piece)
+        self._history += [{"role": "user", "parts": [{"text": str(message)}]}, {"role": "model", "parts": [{"text": text}]}]
+
+
+class _FakeChats:
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+
+    def create(self, *, model: str, config=None, history=None) -> FakeChat:
+        return FakeChat(self._backend, model, config, history)
+
+
+class _FakeModels:
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+
+    def generate_content(self, *, model: str, contents, config=None) -> FakeResponse:
+        upload = self._backend.begin("generate", model, contents)
+        time.sleep(self._backend.latency + upload)
+        return FakeResponse(self._backend.reply(str(contents)))
+
+
+class FakeGenaiClient:
+    """Mimics the parts of ``genai.Client`` the app uses: ``chats.create`` and ``models.generate_content``.
+
+    ``failures`` is consumed one entry per call; ``None`` entries let that call succeed. ``seconds_per_mib`` adds
+    latency proportional to the request payload, e.g. to model uploading inline images.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        first_token_latency: float | None = None,
+        failures: Iterable[Exception | None] = (),
+        reply: Callable[[str], str] = default_reply,
+        chunk_chars: int = 40,
+        seconds_per_mib: float = 0.0,
+        **client_kwargs,
+    ):
+        self._backend = _FakeBackend(latency, first_token_latency, failures, reply, chunk_chars, seconds_per_mib)
+        self.client_kwargs = client_kwargs
+        self.chats = _FakeChats(self._backend)
+        self.models = _FakeModels(self._backend)
+
+    @property
+    def calls(self) -> List[dict]:
+        return self._backend.calls
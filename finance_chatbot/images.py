@@ -0,0 +1,105 @@
+"""Downscaling, re-encoding, duplicate detection and batching of uploaded images before captioning."""
+
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Dict, List
+
+MAX_IMAGE_EDGE = 1600
+JPEG_QUALITY = 85
+PALETTE_COLORS = 256
+SMALL_IMAGE_BYTES = 256 * 1024
+MAX_BATCH_IMAGES = 4
+MAX_BATCH_BYTES = 1024 * 1024
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    width: int = 0
+    height: int = 0
+    content_hash: str = ""
+
+    @property
+    def sent_bytes(self) -> int:
+        return len(self.data)
+
+
+def has_transparency(image) -> bool:
+    if image.mode == "P":
+        return "transparency" in image.info
+    if image.mode in ("RGBA", "LA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return False
+
+
+def prepare_image(data: bytes, mime_type: str) -> PreparedImage:
+    """Caps the longest edge at ``MAX_IMAGE_EDGE``; photos become JPEG, flat screenshots and transparent images PNG.
+
+    The original bytes are kept whenever re-encoding would not make them smaller. Without Pillow, images pass through.
+    """
+    prepared = PreparedImage(data, mime_type, len(data), content_hash=hashlib.sha256(data).hexdigest())
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return prepared
+    try:
+        with Image.open(io.BytesIO(data)) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except Exception:
+        return prepared
+    prepared.width, prepared.height = image.size
+
+    resized = max(image.size) > MAX_IMAGE_EDGE
+    if resized:
+        image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+    output = io.BytesIO()
+    if has_transparency(image):
+        image.save(output, format="PNG", optimize=True)
+        encoded_type = "image/png"
+    elif mime_type == "image/png" and image.convert("RGB").getcolors(PALETTE_COLORS) is not None:
+        image.convert("RGB").quantize(PALETTE_COLORS).save(output, format="PNG", optimize=True)
+        encoded_type = "image/png"
+    else:
+        image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        encoded_type = "image/jpeg"
+    if resized or output.tell() < len(data):
+        prepared.data, prepared.mime_type = output.getvalue(), encoded_type
+        prepared.width, prepared.height = image.size
+    return prepared
+
+
+def find_duplicates(images: List[PreparedImage]) -> List[int]:
+    """Maps each image to the index of the first byte-identical image.
+
+    Only exact copies count: receipts printed from one template look alike to a perceptual hash but carry
+    different amounts, and sharing a caption between them would report the wrong figures.
+    """
+    canonical: List[int] = []
+    by_content: Dict[str, int] = {}
+    for index, image in enumerate(images):
+        canonical.append(by_content.setdefault(image.content_hash, index))
+    return canonical
+
+
+def plan_batches(indexes: List[int], images: List[PreparedImage]) -> List[List[int]]:
+    """Groups small images into shared caption requests; large images are captioned on their own."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_bytes = 0
+    for index in indexes:
+        size = images[index].sent_bytes
+        if size > SMALL_IMAGE_BYTES:
+            batches.append([index])
+            continue
+        if current and (len(current) >= MAX_BATCH_IMAGES or current_bytes + size > MAX_BATCH_BYTES):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(index)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
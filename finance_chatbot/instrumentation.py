@@ -0,0 +1,68 @@
+"""Lightweight per-run stage timing with JSONL export."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List
+
+
+class TurnTrace:
+    """Collects wall time and metrics for the stages of one script run or chat turn."""
+
+    def __init__(self, session_id: str, clock=time.perf_counter):
+        self.session_id = session_id
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self._clock = clock
+        self._started = clock()
+        self.stages: List[dict] = []
+        self.fields: dict = {}
+
+    @contextmanager
+    def stage(self, name: str, **fields) -> Iterator[dict]:
+        record = {"stage": name, **fields}
+        started = self._clock()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((self._clock() - started) * 1000, 2)
+            self.stages.append(record)
+
+    def to_dict(self) -> dict:
+        return {
+            "session": self.session_id,
+            "started_at": self.started_at,
+            "total_ms": round((self._clock() - self._started) * 1000, 2),
+            **self.fields,
+            "stages": self.stages,
+        }
+
+
+class TraceWriter:
+    """Appends traces as JSON lines to ``<directory>/<session_id>.jsonl``."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, directory: str | Path, session_id: str):
+        self.path = Path(directory) / f"{session_id}.jsonl"
+
+    def write(self, trace: dict) -> None:
+        line = json.dumps(trace, ensure_ascii=False, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+def stage_rows(trace: dict) -> List[dict]:
+    rows = []
+    for record in trace["stages"]:
+        extras = {key: value for key, value in record.items() if key not in ("stage", "ms")}
+        rows.append({"stage": record["stage"], "ms": record["ms"], **extras})
+    return rows
+
+
+def to_jsonl(traces: List[dict]) -> str:
+    return "".join(json.dumps(trace, ensure_ascii=False, default=str) + "\n" for trace in traces)
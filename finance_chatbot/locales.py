@@ -0,0 +1,431 @@
+"""Static UI strings, playbooks and option tables for both supported languages."""
+
+LANGUAGE_OPTIONS = ["English", "Indonesian"]
+DEFAULT_LANGUAGE = LANGUAGE_OPTIONS[0]
+
+LANGUAGE_STRINGS = {
+    "English": {
+        "assistant_settings": "Assistant Settings",
+        "api_key_label": "Google AI API Key",
+        "model_label": "Gemini Model",
+        "use_case_label": "Use Case",
+        "tone_label": "Language Style",
+        "creativity_label": "Creativity Bias",
+        "creativity_help": "Lower values force deterministic analysis, higher values allow richer storytelling.",
+        "knowledge_label": "Knowledge Modules",
+        "risk_label": "Risk Appetite",
+        "risk_help": "1 = very cautious, 5 = aggressive growth focus.",
+        "planning_label": "Planning Horizon",
+        "actions_toggle": "Include actionable checklist",
+        "disclaimer_toggle": "Include compliance reminder",
+        "memory_toggle": "Enable session memory",
+        "stream_toggle": "Stream responses",
+        "history_budget_label": "Conversation token budget",
+        "history_budget_help": "Older turns are folded into a running digest once the chat history exceeds this many tokens.",
+        "history_caption": "History ~{history_tokens} tokens · {tokens_saved} saved this turn",
+        "keep_history_toggle": "Keep conversation when settings change",
+        "keep_history_help": "Carries the transcript into the new chat instead of starting over when the persona or model changes.",
+        "compact_context_toggle": "Send persona and documents once",
+        "compact_context_help": "Keeps the persona in the system instruction and only re-sends document context when it changes.",
+        "retrieval_toggle": "Retrieve relevant document excerpts",
+        "retrieval_help": "Index whole documents and send only the excerpts that match each question instead of the first 6,000 characters.",
+        "retrieval_budget_label": "Excerpt token budget",
+        "response_cache_toggle": "Reuse answers to repeated questions",
+        "response_cache_help": "Answer a question asked before under the same settings, documents and remembered facts from the cache instead of calling Gemini again.",
+        "response_cache_similarity_label": "Similar-question threshold",
+        "response_cache_similarity_help": "How close a reworded question must be to a cached one to reuse its answer. 1.00 reuses exact repeats only.",
+        "cached_exact_caption": "♻️ Cached answer (same question asked before) · saved ~{saved:.1f}s",
+        "cached_similar_caption": "♻️ Cached answer ({similarity:.0%} similar question) · saved ~{saved:.1f}s",
+        "response_cache_stats": "Answer cache: {hits} of {lookups} questions reused ({hit_rate:.0%}, {similar_hits} similar) · ~{saved_seconds:.1f}s of Gemini time saved",
+        "theme_label": "Theme",
+        "language_label": "Language",
+        "reset_button": "Reset conversation",
+        "need_api_key": "Please add your Google AI API key in the sidebar to start the consultation.",
+        "page_title": "Financial Consultation Assistant🧑‍💻",
+        "page_caption": "Configurable AI advisor powered by Google Gemini models",
+        "focus_heading": "Focus Areas",
+        "samples_heading": "Sample Prompts",
+        "config_heading": "Current Configuration",
+        "config_model": "Model",
+        "config_tone": "Tone",
+        "config_domains": "Knowledge modules",
+        "config_risk": "Risk appetite",
+        "config_horizon": "Planning horizon",
+        "config_memory": "Session memory",
+        "persona_intro": "You are a Gemini-powered financial consultant specialised in the '{title}' playbook.",
+        "persona_mission": "Mission: {tagline}",
+        "persona_expertise": "Expertise modules to lean on: {knowledge}.",
+        "persona_language_style": "Language style directive: {language_style}",
+        "persona_risk": "Target risk posture: level {risk} on a 1-5 scale (1=capital preservation, 5=aggressive growth).",
+        "persona_horizon": "Planning horizon: {horizon}.",
+        "default_knowledge": "general financial guidance",
+        "status_enabled": "enabled",
+        "status_disabled": "disabled",
+        "attachment_header": "Attach reference documents (optional)",
+        "upload_help": "Upload PDF, text, CSV, or image files to ground the assistant's answers.",
+        "clear_docs": "Clear document context",
+        "chat_placeholder": "Share a financial challenge, goal, or question...",
+        "doc_expander": "Attached document excerpts",
+        "memory_expander": "Session memory snapshot",
+        "memory_prefix": "Session memory: key facts the user shared so far",
+        "memory_goal": "Goals",
+        "memory_amount": "Amounts",
+        "memory_deadline": "Deadlines",
+        "memory_risk": "Risk preference",
+        "memory_currency": "Currencies",
+        "documents_label": "Reference documents supplied by the user:",
+        "documents_cleared": "The user removed the previously shared documents; do not rely on them anymore.",
+        "user_request_label": "User request:",
+        "response_format_title": "Response format:",
+        "response_step_1": "1. Executive insight (1-2 sentences).",
+        "response_step_2": "2. Detailed guidance with numbered recommendations.",
+        "response_step_3": "3. Scenario or calculation examples when useful.",
+        "response_step_4": "4. Resource suggestions (articles, tools, or checklists).",
+        "response_step_5": "5. Compliance or risk caveats (keep concise).",
+        "document_prefix": "Document",
+        "truncated_suffix": " (truncated)",
+        "excerpt_label": "excerpt {position}/{total}",
+        "chunks_label": "{count} indexed excerpts",
+        "ingest_progress": "Processed {name} ({done}/{total})",
+        "caption_models_label": "Image caption model status",
+        "client_pool_stats": "Gemini clients: {clients} pooled · {created} created · {reused} reused",
+        "session_stats": "Sessions: {open} open · {loaded} loaded · {evictions} unloaded while idle",
+        "diagnostics_expander": "Diagnostics",
+        "diagnostics_latest": "Latest {kind}: {total_ms:.0f} ms total",
+        "diagnostics_history": "Recent runs",
+        "diagnostics_download": "Download session trace (JSONL)",
+        "characters_label": "characters",
+        "pages_label": "pages {read}/{total}",
+        "csv_rows_label": "{rows} rows x {columns} columns summarised",
+        "transactions_label": "{count} transactions parsed",
+        "image_label": "{size} · {original} KB uploaded, {sent} KB sent · caption {ms} ms",
+        "image_batch_label": " (batch of {count})",
+        "image_duplicate_label": "same image as {name}, captioned once",
+        "timing_caption": "First token {first_token:.2f}s · total {total:.2f}s",
+        "prompt_size_caption": "Prompt sent: {prompt_chars} characters (~{prompt_tokens} tokens)",
+        "cache_stats": "Extraction cache: {hits} hits · {misses} misses · {entries} cached files",
+        "persona_grounding": "Ground every recommendation in verifiable finance principles and up-to-date best practices.",
+        "persona_assumptions": "Cite assumptions when precise data is unavailable.",
+        "persona_actions": "Always convert insights into a prioritised action plan with owners or suggested tools.",
+        "persona_disclaimer": "Close with a compliance reminder that personalised advice requires a licensed professional.",
+        "persona_language_instruction": "Respond in English.",
+    },
+    "Indonesian": {
+        "assistant_settings": "Pengaturan Asisten",
+        "api_key_label": "Google AI API Key",
+        "model_label": "Model Gemini",
+        "use_case_label": "Skenario",
+        "tone_label": "Gaya Bahasa",
+        "creativity_label": "Bias Kreativitas",
+        "creativity_help": "Nilai rendah membuat analisis lebih deterministik, nilai tinggi memberi ruang cerita yang lebih kaya.",
+        "knowledge_label": "Modul Pengetahuan",
+        "risk_label": "Selera Risiko",
+        "risk_help": "1 = sangat hati-hati, 5 = fokus pertumbuhan agresif.",
+        "planning_label": "Horizon Perencanaan",
+        "actions_toggle": "Sertakan daftar tindakan",
+        "disclaimer_toggle": "Sertakan pengingat kepatuhan",
+        "memory_toggle": "Aktifkan memori sesi",
+        "stream_toggle": "Tampilkan jawaban bertahap",
+        "history_budget_label": "Anggaran token percakapan",
+        "history_budget_help": "Giliran lama diringkas menjadi digest berjalan setelah riwayat chat melebihi jumlah token ini.",
+        "history_caption": "Riwayat ~{history_tokens} token · {tokens_saved} dihemat giliran ini",
+        "keep_history_toggle": "Pertahankan percakapan saat pengaturan berubah",
+        "keep_history_help": "Riwayat percakapan dibawa ke chat baru alih-alih dimulai ulang saat persona atau model berubah.",
+        "compact_context_toggle": "Kirim persona dan dokumen sekali saja",
+        "compact_context_help": "Persona disimpan sebagai instruksi sistem dan konteks dokumen hanya dikirim ulang saat berubah.",
+        "retrieval_toggle": "Ambil cuplikan dokumen yang relevan",
+        "retrieval_help": "Indeks seluruh dokumen dan kirim hanya cuplikan yang cocok dengan pertanyaan, bukan 6.000 karakter pertama.",
+        "retrieval_budget_label": "Anggaran token cuplikan",
+        "response_cache_toggle": "Gunakan ulang jawaban untuk pertanyaan berulang",
+        "response_cache_help": "Jawab pertanyaan yang pernah diajukan dengan pengaturan, dokumen, dan fakta tersimpan yang sama dari cache tanpa memanggil Gemini lagi.",
+        "response_cache_similarity_label": "Ambang pertanyaan serupa",
+        "response_cache_similarity_help": "Seberapa mirip pertanyaan yang diubah susunannya dengan pertanyaan tersimpan agar jawabannya dipakai ulang. 1,00 hanya memakai ulang pertanyaan yang persis sama.",
+        "cached_exact_caption": "♻️ Jawaban dari cache (pertanyaan yang sama pernah diajukan) · hemat ~{saved:.1f} dtk",
+        "cached_similar_caption": "♻️ Jawaban dari cache (pertanyaan {similarity:.0%} serupa) · hemat ~{saved:.1f} dtk",
+        "response_cache_stats": "Cache jawaban: {hits} dari {lookups} pertanyaan dipakai ulang ({hit_rate:.0%}, {similar_hits} serupa) · hemat ~{saved_seconds:.1f} dtk waktu Gemini",
+        "theme_label": "Tema",
+        "language_label": "Bahasa",
+        "reset_button": "Mulai ulang percakapan",
+        "need_api_key": "Tambahkan Google AI API key di sidebar untuk mulai berkonsultasi.",
+        "page_title": "Asisten Konsultasi Keuangan 🧑‍💻",
+        "page_caption": "Konsultan AI yang dapat dikonfigurasi dengan model Google Gemini",
+        "focus_heading": "Bidang Fokus",
+        "samples_heading": "Contoh Pertanyaan",
+        "config_heading": "Konfigurasi Saat Ini",
+        "config_model": "Model",
+        "config_tone": "Gaya",
+        "config_domains": "Modul pengetahuan",
+        "config_risk": "Selera risiko",
+        "config_horizon": "Horizon perencanaan",
+        "config_memory": "Memori sesi",
+        "persona_intro": "Anda adalah konsultan keuangan bertenaga Gemini yang fokus pada playbook '{title}'.",
+        "persona_mission": "Misi: {tagline}",
+        "persona_expertise": "Modul keahlian yang perlu diutamakan: {knowledge}.",
+        "persona_language_style": "Instruksi gaya bahasa: {language_style}",
+        "persona_risk": "Selera risiko target: level {risk} pada skala 1-5 (1=melindungi modal, 5=pertumbuhan agresif).",
+        "persona_horizon": "Horizon perencanaan: {horizon}.",
+        "default_knowledge": "panduan keuangan umum",
+        "status_enabled": "aktif",
+        "status_disabled": "nonaktif",
+        "attachment_header": "Lampirkan dokumen referensi (opsional)",
+        "upload_help": "Unggah file PDF, teks, CSV, atau gambar untuk membantu jawaban asisten.",
+        "clear_docs": "Bersihkan konteks dokumen",
+        "chat_placeholder": "Bagikan tantangan, tujuan, atau pertanyaan keuangan...",
+        "doc_expander": "Cuplikan dokumen terlampir",
+        "memory_expander": "Ringkasan memori sesi",
+        "memory_prefix": "Memori sesi: fakta penting yang dibagikan pengguna sejauh ini",
+        "memory_goal": "Tujuan",
+        "memory_amount": "Nominal",
+        "memory_deadline": "Tenggat",
+        "memory_risk": "Preferensi risiko",
+        "memory_currency": "Mata uang",
+        "documents_label": "Dokumen referensi dari pengguna:",
+        "documents_cleared": "Pengguna telah menghapus dokumen yang dibagikan sebelumnya; jangan gunakan lagi.",
+        "user_request_label": "Permintaan pengguna:",
+        "response_format_title": "Format respons:",
+        "response_step_1": "1. Wawasan utama (1-2 kalimat).",
+        "response_step_2": "2. Rekomendasi rinci dengan penomoran.",
+        "response_step_3": "3. Contoh skenario atau perhitungan bila relevan.",
+        "response_step_4": "4. Rekomendasi sumber daya (artikel, alat, atau daftar periksa).",
+        "response_step_5": "5. Catatan kepatuhan atau risiko (singkat saja).",
+        "document_prefix": "Dokumen",
+        "truncated_suffix": " (dipersingkat)",
+        "excerpt_label": "cuplikan {position}/{total}",
+        "chunks_label": "{count} cuplikan terindeks",
+        "ingest_progress": "Selesai memproses {name} ({done}/{total})",
+        "caption_models_label": "Status model deskripsi gambar",
+        "client_pool_stats": "Klien Gemini: {clients} di pool · {created} dibuat · {reused} dipakai ulang",
+        "session_stats": "Sesi: {open} terbuka · {loaded} dimuat · {evictions} dilepas saat tidak aktif",
+        "diagnostics_expander": "Diagnostik",
+        "diagnostics_latest": "{kind} terakhir: total {total_ms:.0f} ms",
+        "diagnostics_history": "Eksekusi terbaru",
+        "diagnostics_download": "Unduh jejak sesi (JSONL)",
+        "characters_label": "karakter",
+        "pages_label": "halaman {read}/{total}",
+        "csv_rows_label": "{rows} baris x {columns} kolom diringkas",
+        "transactions_label": "{count} transaksi terbaca",
+        "image_label": "{size} · {original} KB diunggah, {sent} KB dikirim · keterangan {ms} ms",
+        "image_batch_label": " (kelompok {count} gambar)",
+        "image_duplicate_label": "gambar sama dengan {name}, dijelaskan sekali",
+        "timing_caption": "Token pertama {first_token:.2f} dtk · total {total:.2f} dtk",
+        "prompt_size_caption": "Prompt terkirim: {prompt_chars} karakter (~{prompt_tokens} token)",
+        "cache_stats": "Cache ekstraksi: {hits} hit · {misses} miss · {entries} file tersimpan",
+        "persona_grounding": "Dasarkan setiap rekomendasi pada prinsip keuangan yang dapat diverifikasi dan praktik terbaru.",
+        "persona_assumptions": "Sebutkan asumsi saat data presisi tidak tersedia.",
+        "persona_actions": "Selalu ubah wawasan menjadi daftar tindakan terurut lengkap dengan penanggung jawab atau alat yang disarankan.",
+        "persona_disclaimer": "Akhiri dengan pengingat bahwa saran personal memerlukan profesional berlisensi.",
+        "persona_language_instruction": "Gunakan bahasa Indonesia dalam setiap jawaban.",
+    },
+}
+
+KNOWLEDGE_OPTIONS = [
+    "Asset Allocation",
+    "Behavioral Finance",
+    "Budgeting",
+    "Corporate Finance",
+    "Credit Management",
+    "Customer Service",
+    "Education",
+    "FX Markets",
+    "Personal Finance",
+    "Productivity",
+    "Regulations",
+    "Retail Banking",
+    "Risk Management",
+    "Savings",
+    "Small Business",
+    "Tax Planning",
+    "Travel",
+]
+
+KNOWLEDGE_OPTION_LABELS = {
+    "Asset Allocation": {"English": "Asset Allocation", "Indonesian": "Alokasi Aset"},
+    "Behavioral Finance": {"English": "Behavioral Finance", "Indonesian": "Keuangan Perilaku"},
+    "Budgeting": {"English": "Budgeting", "Indonesian": "Penganggaran"},
+    "Corporate Finance": {"English": "Corporate Finance", "Indonesian": "Keuangan Korporat"},
+    "Credit Management": {"English": "Credit Management", "Indonesian": "Manajemen Kredit"},
+    "Customer Service": {"English": "Customer Service", "Indonesian": "Layanan Pelanggan"},
+    "Education": {"English": "Education", "Indonesian": "Pendidikan"},
+    "FX Markets": {"English": "FX Markets", "Indonesian": "Pasar Valuta Asing"},
+    "Personal Finance": {"English": "Personal Finance", "Indonesian": "Keuangan Pribadi"},
+    "Productivity": {"English": "Productivity", "Indonesian": "Produktivitas"},
+    "Regulations": {"English": "Regulations", "Indonesian": "Regulasi"},
+    "Retail Banking": {"English": "Retail Banking", "Indonesian": "Perbankan Ritel"},
+    "Risk Management": {"English": "Risk Management", "Indonesian": "Manajemen Risiko"},
+    "Savings": {"English": "Savings", "Indonesian": "Tabungan"},
+    "Small Business": {"English": "Small Business", "Indonesian": "Usaha Kecil"},
+    "Tax Planning": {"English": "Tax Planning", "Indonesian": "Perencanaan Pajak"},
+    "Travel": {"English": "Travel", "Indonesian": "Perjalanan"},
+}
+
+LANGUAGE_STYLE_LABELS = {
+    "Formal": {"English": "Formal", "Indonesian": "Formal"},
+    "Conversational": {"English": "Conversational", "Indonesian": "Percakapan"},
+    "Analytical": {"English": "Analytical", "Indonesian": "Analitis"},
+}
+
+LANGUAGE_STYLE_DESCRIPTIONS = {
+    "Formal": {
+        "English": "Deliver polished, compliance-friendly prose with structured paragraphs.",
+        "Indonesian": "Gunakan bahasa resmi yang sesuai kepatuhan dengan paragraf terstruktur.",
+    },
+    "Conversational": {
+        "English": "Use approachable, empathetic language with practical analogies.",
+        "Indonesian": "Gunakan bahasa akrab dan empatik dengan analogi yang mudah dipahami.",
+    },
+    "Analytical": {
+        "English": "Lead with metrics, benchmarks, and scenario analysis.",
+        "Indonesian": "Fokus pada metrik, tolok ukur, dan analisis skenario.",
+    },
+}
+
+CREATIVITY_MODE_TEXT = {
+    "English": {
+        "low": "Prioritise precision and policy alignment over creativity.",
+        "balanced": "Blend strategic insight with practical examples.",
+        "high": "Incorporate creative storytelling while staying financially sound.",
+    },
+    "Indonesian": {
+        "low": "Utamakan ketepatan dan kepatuhan kebijakan dibanding kreativitas.",
+        "balanced": "Padukan wawasan strategis dengan contoh praktis.",
+        "high": "Gunakan cerita kreatif tanpa mengorbankan ketepatan finansial.",
+    },
+}
+
+TIME_HORIZONS = ["Immediate", "30 Days", "Quarter", "Annual", "Multi-Year"]
+TIME_HORIZON_LABELS = {
+    "Immediate": {"English": "Immediate", "Indonesian": "Segera"},
+    "30 Days": {"English": "30 Days", "Indonesian": "30 Hari"},
+    "Quarter": {"English": "Quarter", "Indonesian": "Triwulan"},
+    "Annual": {"English": "Annual", "Indonesian": "Tahunan"},
+    "Multi-Year": {"English": "Multi-Year", "Indonesian": "Multi-Tahun"},
+}
+
+USE_CASES = {
+    "retail_banking": {
+        "default_domains": ["Retail Banking", "Customer Service", "Regulations"],
+        "locales": {
+            "English": {
+                "title": "Retail Banking Concierge",
+                "tagline": "Resolve account questions, fees, and loan inquiries with empathetic clarity.",
+                "focus": [
+                    "Explain account activity, fees, and policy details",
+                    "Guide users through loan or card application steps",
+                    "Escalate red-flag scenarios with clear next actions",
+                ],
+                "sample_prompts": [
+                    "Help me understand why I was charged overdraft fees last week.",
+                    "Walk me through the steps to dispute a credit card transaction.",
+                ],
+            },
+            "Indonesian": {
+                "title": "Konsier Perbankan Ritel",
+                "tagline": "Selesaikan pertanyaan rekening, biaya, dan pengajuan pinjaman dengan empati dan kejelasan.",
+                "focus": [
+                    "Menjelaskan aktivitas rekening, biaya, dan detail kebijakan",
+                    "Memandu nasabah melalui tahapan pengajuan pinjaman atau kartu",
+                    "Mengeskalasi situasi berisiko dengan langkah lanjutan yang jelas",
+                ],
+                "sample_prompts": [
+                    "Jelaskan mengapa saya dikenakan biaya overdraft minggu lalu.",
+                    "Panduan langkah demi langkah untuk menggugat transaksi kartu kredit.",
+                ],
+            },
+        },
+    },
+    "financial_literacy": {
+        "default_domains": ["Education", "Budgeting", "Behavioral Finance"],
+        "locales": {
+            "English": {
+                "title": "Financial Literacy Coach",
+                "tagline": "Teach core money concepts with digestible lessons and practical activities.",
+                "focus": [
+                    "Simplify jargon and reinforce the fundamentals",
+                    "Offer budgeting drills and literacy challenges",
+                    "Adapt explanations to the learner's confidence level",
+                ],
+                "sample_prompts": [
+                    "Create a lesson plan to explain compound interest to college students.",
+                    "Give me a weekly challenge to build emergency savings.",
+                ],
+            },
+            "Indonesian": {
+                "title": "Pelatih Literasi Keuangan",
+                "tagline": "Ajarkan konsep uang penting dengan sesi yang mudah dipahami dan latihan praktis.",
+                "focus": [
+                    "Menyederhanakan istilah teknis dan menegaskan dasar-dasarnya",
+                    "Memberikan latihan anggaran dan tantangan literasi",
+                    "Menyesuaikan penjelasan dengan tingkat kepercayaan diri peserta",
+                ],
+                "sample_prompts": [
+                    "Buat rencana pembelajaran untuk menjelaskan bunga majemuk kepada mahasiswa.",
+                    "Berikan tantangan mingguan agar saya bisa membangun dana darurat.",
+                ],
+            },
+        },
+    },
+    "travel_budget": {
+        "default_domains": ["Travel", "FX Markets", "Savings"],
+        "locales": {
+            "English": {
+                "title": "Travel Budget Strategist",
+                "tagline": "Blend itinerary planning with real-world cost controls and currency tips.",
+                "focus": [
+                    "Design itineraries aligned to spending caps",
+                    "Highlight cross-border fees, FX, and insurance needs",
+                    "Suggest savings tactics before and during the trip",
+                ],
+                "sample_prompts": [
+                    "Plan a 5-day Tokyo trip under $2,000 all-in.",
+                    "How should I budget for a family vacation across three EU cities?",
+                ],
+            },
+            "Indonesian": {
+                "title": "Strateg Keuangan Perjalanan",
+                "tagline": "Padukan perencanaan perjalanan dengan pengendalian biaya dan tips mata uang.",
+                "focus": [
+                    "Mendesain itinerary yang sesuai batas pengeluaran",
+                    "Menyoroti biaya lintas negara, valuta asing, dan kebutuhan asuransi",
+                    "Menyarankan cara menghemat sebelum dan selama perjalanan",
+                ],
+                "sample_prompts": [
+                    "Rencanakan perjalanan 5 hari ke Tokyo dengan total anggaran di bawah $2.000.",
+                    "Bagaimana saya harus menyusun anggaran liburan keluarga ke tiga kota di Uni Eropa?",
+                ],
+            },
+        },
+    },
+    "productivity_partner": {
+        "default_domains": ["Personal Finance", "Productivity", "Behavioral Finance"],
+        "locales": {
+            "English": {
+                "title": "Productivity & Savings Partner",
+                "tagline": "Turn financial goals into repeatable rituals and smart nudges.",
+                "focus": [
+                    "Translate goals into trackable milestones",
+                    "Recommend automations, alerts, and review cadences",
+                    "Keep momentum with motivational check-ins",
+                ],
+                "sample_prompts": [
+                    "Help me build a 90-day sprint to pay down $5k of debt.",
+                    "What automation rules should I create to stay on budget?",
+                ],
+            },
+            "Indonesian": {
+                "title": "Partner Produktivitas & Tabungan",
+                "tagline": "Ubah tujuan keuangan menjadi rutinitas dan pengingat yang konsisten.",
+                "focus": [
+                    "Menerjemahkan tujuan ke dalam tonggak yang dapat dilacak",
+                    "Merekomendasikan otomatisasi, pengingat, dan ritme evaluasi",
+                    "Menjaga momentum dengan check-in yang memotivasi",
+                ],
+                "sample_prompts": [
+                    "Bantu saya menyusun sprint 90 hari untuk melunasi utang $5k.",
+                    "Otomatisasi apa yang perlu saya buat agar anggaran tetap terjaga?",
+                ],
+            },
+        },
+    },
+}
+
+USE_CASE_ORDER = list(USE_CASES.keys())
@@ -0,0 +1,154 @@
+"""Compact, bounded memory of facts extracted from user messages."""
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+CATEGORY_ORDER = ["goal", "amount", "deadline", "risk", "currency"]
+CATEGORY_IMPORTANCE = {"goal": 3.0, "risk": 3.0, "deadline": 2.0, "amount": 2.0, "currency": 1.0}
+SINGLE_VALUE_CATEGORIES = {"risk"}
+MAX_VALUE_CHARS = 80
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "rp": "IDR"}
+CURRENCY_CODES = {"USD", "IDR", "EUR", "GBP", "JPY", "SGD", "AUD", "CAD", "CHF", "CNY", "MYR"}
+CURRENCY_WORDS = {"dollar": "USD", "dollars": "USD", "rupiah": "IDR", "euro": "EUR", "euros": "EUR", "yen": "JPY"}
+
+AMOUNT_PATTERN = re.compile(
+    r"(?:(?P<prefix>[$€£¥]|\bRp\.?|\b(?:USD|IDR|EUR|GBP|JPY|SGD|AUD|CAD|CHF|CNY|MYR))\s?"
+    r"(?P<number>\d[\d.,]*)(?P<suffix>\s?(?:k|m|bn|rb|ribu|jt|juta|miliar)\b)?)"
+    r"|(?:\b(?P<number2>\d[\d.,]*)(?P<suffix2>\s?(?:k|m|bn|rb|ribu|jt|juta|miliar))?\s?"
+    r"(?P<postfix>USD|IDR|EUR|GBP|JPY|SGD|AUD|dollars?|rupiah|euros?|yen)\b)",
+    re.IGNORECASE,
+)
+GOAL_PATTERN = re.compile(
+    r"\b(?:save (?:up )?for|saving for|pay (?:down|off)|buy(?:ing)?|build(?:ing)?|retire|invest(?:ing)? in|afford|"
+    r"reduce|emergency fund|menabung untuk|menabung|melunasi|membeli|membangun|dana darurat|pensiun)\b[^.?!,;\n]{0,60}",
+    re.IGNORECASE,
+)
+DEADLINE_PATTERN = re.compile(
+    r"\b(?:(?:in|within|over|by|before|for|dalam|sebelum|selama)\s+(?:the next\s+)?"
+    r"(?:\d+|a|an|one|two|three|six|twelve|satu|dua|tiga|enam)\s*-?\s*"
+    r"(?:days?|weeks?|months?|years?|hari|minggu|bulan|tahun)"
+    r"|\d+[- ](?:day|week|month|year|hari|bulan)"
+    r"|by (?:the )?(?:end of (?:the )?(?:year|month|quarter)|next (?:year|month)|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december)(?: \d{4})?)\b",
+    re.IGNORECASE,
+)
+RISK_KEYWORDS = [
+    ("conservative", r"\b(?:conservative|low[- ]risk|risk[- ]averse|cautious|konservatif|risiko rendah|hati-hati)\b"),
+    ("aggressive", r"\b(?:aggressive|high[- ]risk|growth[- ]focused|agresif|risiko tinggi)\b"),
+    ("moderate", r"\b(?:moderate|balanced risk|medium risk|moderat|risiko sedang)\b"),
+]
+
+
+@dataclass
+class MemoryEntry:
+    category: str
+    value: str
+    importance: float
+    first_seen: int
+    last_seen: int
+    mentions: int = 1
+
+
+def normalise(value: str) -> str:
+    return " ".join(value.split()).strip(" -:")[:MAX_VALUE_CHARS]
+
+
+def extract_facts(message: str) -> List[tuple]:
+    facts = []
+    for match in AMOUNT_PATTERN.finditer(message):
+        facts.append(("amount", normalise(match.group(0))))
+        marker = (match.group("prefix") or match.group("postfix") or "").lower().rstrip(".")
+        currency = CURRENCY_SYMBOLS.get(marker) or CURRENCY_WORDS.get(marker) or marker.upper()
+        if currency in CURRENCY_CODES:
+            facts.append(("currency", currency))
+    for code in CURRENCY_CODES:
+        if re.search(rf"\b{code}\b", message):
+            facts.append(("currency", code))
+    for match in GOAL_PATTERN.finditer(message):
+        facts.append(("goal", normalise(match.group(0))))
+    for match in DEADLINE_PATTERN.finditer(message):
+        facts.append(("deadline", normalise(match.group(0))))
+    for label, pattern in RISK_KEYWORDS:
+        if re.search(pattern, message, re.IGNORECASE):
+            facts.append(("risk", label))
+            break
+    return facts
+
+
+class MemoryStore:
+    """Keyed fact store: duplicates refresh existing entries and the lowest scoring entries are evicted first.
+
+    The score is the category importance (plus repeat mentions) minus ``recency_decay`` per turn since last seen.
+    """
+
+    def __init__(self, capacity: int = 12, recency_decay: float = 0.25):
+        self.capacity = capacity
+        self.recency_decay = recency_decay
+        self.turn = 0
+        self._entries: Dict[str, MemoryEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(category: str, value: str) -> str:
+        if category in SINGLE_VALUE_CATEGORIES:
+            return category
+        return f"{category}:{value.lower()}"
+
+    def score(self, entry: MemoryEntry) -> float:
+        return entry.importance - self.recency_decay * (self.turn - entry.last_seen)
+
+    def observe(self, message: str) -> List[str]:
+        self.turn += 1
+        touched = []
+        for category, value in extract_facts(message):
+            if not value:
+                continue
+            key = self.key(category, value)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = MemoryEntry(category, value, CATEGORY_IMPORTANCE[category], self.turn, self.turn)
+            elif entry.last_seen != self.turn or entry.value != value:
+                entry.value = value
+                entry.last_seen = self.turn
+                entry.mentions += 1
+                entry.importance = min(CATEGORY_IMPORTANCE[category] + 2.0, entry.importance + 0.5)
+            touched.append(key)
+        while len(self._entries) > self.capacity:
+            weakest = min(self._entries, key=lambda item: (self.score(self._entries[item]), self._entries[item].last_seen))
+            del self._entries[weakest]
+        return touched
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "recency_decay": self.recency_decay,
+            "turn": self.turn,
+            "entries": {key: asdict(entry) for key, entry in self._entries.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MemoryStore":
+        store = cls(capacity=data["capacity"], recency_decay=data["recency_decay"])
+        store.turn = data["turn"]
+        store._entries = {key: MemoryEntry(**entry) for key, entry in data["entries"].items()}
+        return store
+
+    def entries(self) -> List[MemoryEntry]:
+        return sorted(
+            self._entries.values(),
+            key=lambda entry: (CATEGORY_ORDER.index(entry.category), -self.score(entry), entry.first_seen),
+        )
+
+    def render(self, labels: Dict[str, str], max_chars: int = 600) -> str:
+        grouped: Dict[str, List[str]] = {}
+        for entry in self.entries():
+            grouped.setdefault(entry.category, []).append(entry.value)
+        lines = [f"{labels[category]}: {'; '.join(grouped[category])}" for category in CATEGORY_ORDER if category in grouped]
+        block = "\n".join(lines)
+        if len(block) > max_chars:
+            block = block[: max_chars - 1].rstrip() + "…"
+        return block
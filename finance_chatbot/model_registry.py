@@ -0,0 +1,61 @@
+"""Process-wide record of which Gemini models are currently usable."""
+
+import threading
+import time
+from typing import Callable, Dict, List
+
+
+class ModelAvailabilityRegistry:
+    """Remembers model successes and deterministic failures for ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: float = 900.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._status: Dict[str, dict] = {}
+
+    def _current(self, model: str) -> dict | None:
+        entry = self._status.get(model)
+        if entry is None:
+            return None
+        if self._clock() - entry["recorded_at"] > self.ttl_seconds:
+            del self._status[model]
+            return None
+        return entry
+
+    def record_success(self, model: str) -> None:
+        with self._lock:
+            self._status[model] = {"available": True, "reason": None, "recorded_at": self._clock()}
+
+    def record_failure(self, model: str, reason: str) -> None:
+        with self._lock:
+            self._status[model] = {"available": False, "reason": reason, "recorded_at": self._clock()}
+
+    def order(self, candidates: List[str]) -> List[str]:
+        with self._lock:
+            known_good, unknown, known_bad = [], [], []
+            for model in candidates:
+                entry = self._current(model)
+                if entry is None:
+                    unknown.append(model)
+                elif entry["available"]:
+                    known_good.append(model)
+                else:
+                    known_bad.append(model)
+        if known_good or unknown:
+            return known_good + unknown
+        return known_bad
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            now = self._clock()
+            for model in list(self._status):
+                self._current(model)
+            return {
+                model: {
+                    "available": entry["available"],
+                    "reason": entry["reason"],
+                    "age_seconds": round(now - entry["recorded_at"], 1),
+                }
+                for model, entry in self._status.items()
+            }
@@ -0,0 +1,188 @@
+"""Persona and per-turn prompt assembly.
+
+Persona, response-format and memory-label blocks only depend on the profile settings and language,
+so they are compiled once and memoized; call ``clear_prompt_caches()`` after editing the locale tables.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import List, Tuple
+
+from finance_chatbot.locales import (
+    CREATIVITY_MODE_TEXT,
+    KNOWLEDGE_OPTION_LABELS,
+    LANGUAGE_STRINGS,
+    LANGUAGE_STYLE_DESCRIPTIONS,
+    TIME_HORIZON_LABELS,
+    USE_CASES,
+)
+from finance_chatbot.memory_store import MemoryStore
+
+CHARS_PER_TOKEN = 4
+MEMORY_BLOCK_CHARS = 600
+PERSONA_CACHE_SIZE = 256
+
+
+def tr(key: str, language: str) -> str:
+    return LANGUAGE_STRINGS[language][key]
+
+
+def tables_fingerprint() -> str:
+    tables = [
+        LANGUAGE_STRINGS,
+        KNOWLEDGE_OPTION_LABELS,
+        LANGUAGE_STYLE_DESCRIPTIONS,
+        TIME_HORIZON_LABELS,
+        CREATIVITY_MODE_TEXT,
+        USE_CASES,
+    ]
+    return hashlib.sha256(json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+_tables_version = tables_fingerprint()
+
+
+def clear_prompt_caches() -> str:
+    """Drops every memoized block and re-fingerprints the locale tables; returns the new fingerprint."""
+    global _tables_version
+    _tables_version = tables_fingerprint()
+    for cached in (_compile_persona, _compile_response_format, _compile_system_instruction, _memory_labels):
+        cached.cache_clear()
+    return _tables_version
+
+
+def prompt_cache_info() -> dict:
+    info = _compile_persona.cache_info()
+    return {"tables": _tables_version, "hits": info.hits, "misses": info.misses, "entries": info.currsize}
+
+
+def creativity_mode(creativity_level: float) -> str:
+    if creativity_level <= 0.3:
+        return "low"
+    if creativity_level >= 0.7:
+        return "high"
+    return "balanced"
+
+
+def persona_signature(
+    *,
+    use_case: str,
+    tone: str,
+    knowledge_domains: List[str],
+    risk_band: int,
+    horizon: str,
+    include_actions: bool,
+    include_disclaimer: bool,
+    creativity_level: float,
+    language: str,
+) -> Tuple:
+    return (
+        use_case,
+        tone,
+        tuple(knowledge_domains),
+        risk_band,
+        horizon,
+        bool(include_actions),
+        bool(include_disclaimer),
+        creativity_mode(creativity_level),
+        language,
+    )
+
+
+def build_persona_prompt(**profile) -> str:
+    return _compile_persona(persona_signature(**profile), _tables_version)
+
+
+@lru_cache(maxsize=PERSONA_CACHE_SIZE)
+def _compile_persona(signature: Tuple, tables_version: str) -> str:
+    use_case, tone, knowledge_domains, risk_band, horizon, include_actions, include_disclaimer, mode, language = signature
+    case_locale = USE_CASES[use_case]["locales"][language]
+    if knowledge_domains:
+        knowledge_text = ", ".join(KNOWLEDGE_OPTION_LABELS[item][language] for item in knowledge_domains)
+    else:
+        knowledge_text = tr("default_knowledge", language)
+    creativity_prompt = CREATIVITY_MODE_TEXT[language][mode]
+
+    guidelines = [
+        tr("persona_intro", language).format(title=case_locale["title"]),
+        tr("persona_mission", language).format(tagline=case_locale["tagline"]),
+        tr("persona_expertise", language).format(knowledge=knowledge_text),
+        tr("persona_language_style", language).format(language_style=LANGUAGE_STYLE_DESCRIPTIONS[tone][language]),
+        tr("persona_risk", language).format(risk=risk_band),
+        tr("persona_horizon", language).format(horizon=TIME_HORIZON_LABELS[horizon][language]),
+        creativity_prompt,
+        tr("persona_grounding", language),
+        tr("persona_assumptions", language),
+    ]
+    if include_actions:
+        guidelines.append(tr("persona_actions", language))
+    if include_disclaimer:
+        guidelines.append(tr("persona_disclaimer", language))
+    guidelines.append(tr("persona_language_instruction", language))
+    return chr(10).join(guidelines)
+
+
+def build_response_format(language: str) -> str:
+    return _compile_response_format(language, _tables_version)
+
+
+@lru_cache(maxsize=None)
+def _compile_response_format(language: str, tables_version: str) -> str:
+    return "\n".join(
+        [
+            tr("response_format_title", language),
+            tr("response_step_1", language),
+            tr("response_step_2", language),
+            tr("response_step_3", language),
+            tr("response_step_4", language),
+            tr("response_step_5", language),
+        ]
+    )
+
+
+def build_system_instruction(persona_prompt: str, language: str) -> str:
+    return _compile_system_instruction(persona_prompt, language, _tables_version)
+
+
+@lru_cache(maxsize=PERSONA_CACHE_SIZE)
+def _compile_system_instruction(persona_prompt: str, language: str, tables_version: str) -> str:
+    return persona_prompt + "\n\n" + build_response_format(language)
+
+
+def build_structured_prompt(
+    *,
+    persona_prompt: str | None,
+    user_message: str,
+    memory_block: str,
+    documents: List[str],
+    language: str,
+    documents_cleared: bool = False,
+    include_response_format: bool = True,
+):
+    sections = [persona_prompt] if persona_prompt else []
+    if memory_block:
+        sections.append(tr("memory_prefix", language) + "\n" + memory_block)
+    if documents:
+        sections.append(tr("documents_label", language) + "\n" + "\n\n".join(documents))
+    elif documents_cleared:
+        sections.append(tr("documents_cleared", language))
+    sections.append(tr("user_request_label", language) + "\n" + user_message)
+    if include_response_format:
+        sections.append(build_response_format(language))
+    return "\n\n".join(sections)
+
+
+@lru_cache(maxsize=None)
+def _memory_labels(language: str, tables_version: str) -> dict:
+    return {
+        category: tr(f"memory_{category}", language) for category in ("goal", "amount", "deadline", "risk", "currency")
+    }
+
+
+def render_memory(store: MemoryStore, language: str) -> str:
+    return store.render(_memory_labels(language, _tables_version), MEMORY_BLOCK_CHARS)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,267 @@
+"""Deadlines, retries, concurrency limits and a circuit breaker around Gemini calls."""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL")
+QUOTA_STATUS_CODE = 429
+QUOTA_MARKER = "RESOURCE_EXHAUSTED"
+TRANSIENT_EXCEPTION_NAMES = ("Timeout", "TimeoutException", "ConnectError", "NetworkError", "RemoteProtocolError")
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (CircuitOpenError, DeadlineExceededError)):
+        return False
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__.endswith(TRANSIENT_EXCEPTION_NAMES) for cls in type(exc).__mro__):
+        return True
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    message = str(exc)
+    return any(str(status) in message for status in RETRYABLE_STATUS_CODES) or any(
+        marker in message for marker in RETRYABLE_MARKERS
+    )
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    """429 / RESOURCE_EXHAUSTED: one API key is over its quota, which says nothing about the service as a whole."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code == QUOTA_STATUS_CODE
+    message = str(exc)
+    return str(QUOTA_STATUS_CODE) in message or QUOTA_MARKER in message
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures, probes again after ``reset_seconds``.
+
+    The breaker is shared by every API key, so per-key quota errors (429) are retried but never counted.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """Ends a probe that finished without a verdict, so the next call may probe again."""
+        with self._lock:
+            self._probing = False
+
+
+class ResilientCaller:
+    """Runs callables with a total deadline, jittered exponential backoff and a shared concurrency limit."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline_seconds: float = 90.0,
+        max_concurrency: int = 8,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._sleep = sleep
+        self._clock = clock
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "circuit": self.breaker.state}
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return ceiling * self._jitter()
+
+    def _acquire(self, deadline: float) -> None:
+        if not self._slots.acquire(timeout=max(0.0, deadline - self._clock())):
+            self._count("rejected")
+            raise DeadlineExceededError("Timed out waiting for a free Gemini request slot.")
+
+    def _attempts(self, deadline_seconds: float | None) -> Iterator[tuple[int, float]]:
+        deadline = self._clock() + (deadline_seconds or self.deadline_seconds)
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError("Gemini is temporarily unavailable; please try again shortly.")
+            yield attempt, deadline
+
+    def _handle_failure(self, exc: Exception, attempt: int, deadline: float) -> float:
+        """Re-raises ``exc`` unless another attempt fits before the deadline; returns the backoff to sleep first."""
+        if not is_retryable(exc) or is_quota_error(exc):
+            # Gemini answered: a rejected request or an exhausted key says the service itself is up.
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        if not is_retryable(exc):
+            raise exc
+        delay = self._backoff(attempt)
+        if attempt + 1 >= self.max_attempts or self._clock() + delay >= deadline:
+            self._count("failures")
+            raise exc
+        self._count("retries")
+        return delay
+
+    def call(self, func: Callable[..., Any], *args, deadline_seconds: float | None = None, **kwargs) -> Any:
+        self._count("calls")
+        for attempt, deadline in self._attempts(deadline_seconds):
+            try:
+                self._acquire(deadline)
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._handle_failure(exc, attempt, deadline)
+                else:
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    self._slots.release()
+            finally:
+                self.breaker.release()
+            self._sleep(delay)
+        raise DeadlineExceededError("Gemini request did not complete.")
+
+    def stream(self, func: Callable[..., Iterator[Any]], *args, deadline_seconds: float | None = None, **kwargs) -> Iterator[Any]:
+        self._count("calls")
+        for attempt, deadline in self._attempts(deadline_seconds):
+            try:
+                self._acquire(deadline)
+                try:
+                    chunks = iter(func(*args, **kwargs))
+                    first = next(chunks, None)
+                except Exception as exc:
+                    self._slots.release()
+                    delay = self._handle_failure(exc, attempt, deadline)
+                else:
+                    try:
+                        if first is not None:
+                            yield first
+                        yield from chunks
+                    except GeneratorExit:
+                        raise
+                    except Exception:
+                        self.breaker.record_failure()
+                        raise
+                    else:
+                        self.breaker.record_success()
+                    finally:
+                        self._slots.release()
+                    return
+            finally:
+                self.breaker.release()
+            self._sleep(delay)
+        raise DeadlineExceededError("Gemini request did not complete.")
+
+
+class ResilientChat:
+    def __init__(self, chat, caller: ResilientCaller):
+        self._chat = chat
+        self._caller = caller
+
+    def send_message(self, message, **kwargs):
+        return self._caller.call(self._chat.send_message, message, **kwargs)
+
+    def send_message_stream(self, message, **kwargs):
+        return self._caller.stream(self._chat.send_message_stream, message, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._chat, name)
+
+
+class _ResilientChats:
+    def __init__(self, chats, caller: ResilientCaller):
+        self._chats = chats
+        self._caller = caller
+
+    def create(self, **kwargs) -> ResilientChat:
+        return ResilientChat(self._chats.create(**kwargs), self._caller)
+
+
+class _ResilientModels:
+    def __init__(self, models, caller: ResilientCaller):
+        self._models = models
+        self._caller = caller
+
+    def generate_content(self, **kwargs):
+        return self._caller.call(self._models.generate_content, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._models, name)
+
+
+class ResilientClient:
+    """Wraps a ``genai.Client`` (or a fake) so chat and content calls go through a ``ResilientCaller``."""
+
+    def __init__(self, client, caller: ResilientCaller):
+        self.client = client
+        self.caller = caller
+        self.models = _ResilientModels(client.models, caller)
+        self.chats = _ResilientChats(client.chats, caller)
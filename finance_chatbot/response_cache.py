@@ -0,0 +1,192 @@
+"""Process-wide cache of Gemini answers to repeated questions asked under the same settings and documents."""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+PROMPT_TOKEN = re.compile(r"[^\W_]+|[$€£¥%]")
+NUMBER_TOKEN = re.compile(r"\d")
+SHINGLE_CHARS = 3
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-folded words, numbers and currency symbols separated by single spaces; other punctuation is dropped."""
+    return " ".join(PROMPT_TOKEN.findall(prompt.casefold()))
+
+
+def shingles(normalized: str) -> FrozenSet[str]:
+    padded = f" {normalized} "
+    return frozenset(padded[index : index + SHINGLE_CHARS] for index in range(len(padded) - SHINGLE_CHARS + 1))
+
+
+def numbers(normalized: str) -> Tuple[str, ...]:
+    return tuple(token for token in normalized.split() if NUMBER_TOKEN.search(token))
+
+
+def documents_hash(documents: List[dict]) -> str:
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc["name"].encode("utf-8", "ignore") + b"\0")
+        digest.update(doc["content"].encode("utf-8", "ignore") + b"\0")
+    return digest.hexdigest()
+
+
+def history_hash(digest_text: str, messages: List[dict]) -> str:
+    """The conversation the chat has seen: the compacted digest plus the transcript kept verbatim after it."""
+    digest = hashlib.sha256(digest_text.encode("utf-8", "ignore") + b"\0")
+    for message in messages:
+        digest.update(f"{message['role']}\0{message['content']}\0".encode("utf-8", "ignore"))
+    return digest.hexdigest()
+
+
+def response_scope(profile_signature: str, documents_key: str, memory_block: str = "", history_key: str = "") -> str:
+    """Answers are only shared between turns with the same settings, documents, remembered facts and history.
+
+    The API key is deliberately left out: users who ask the same opening question under the same settings should
+    share the answer, and anything specific to one user's conversation is already in the history.
+    """
+    parts = [profile_signature, documents_key, memory_block, history_key]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    kind: str
+    similarity: float
+    saved_seconds: float
+
+
+@dataclass
+class _Entry:
+    answer: str
+    latency: float
+    stored_at: float
+    shingles: FrozenSet[str]
+    numbers: Tuple[str, ...]
+
+
+class ResponseCache:
+    """Thread-safe LRU with a TTL, keyed by scope and normalized prompt.
+
+    Near-duplicate lookup compares character-trigram Jaccard similarity against the other prompts cached in the same
+    scope, and never matches prompts whose numbers differ ("$2,000" versus "$3,000"). A threshold of 1.0 or more
+    turns it off.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600,
+        similarity: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._by_scope: Dict[str, Dict[str, None]] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, scope: str, prompt: str, similarity: float | None = None) -> CachedAnswer | None:
+        threshold = self.similarity if similarity is None else similarity
+        normalized = normalize_prompt(prompt)
+        with self._lock:
+            now = self._clock()
+            match = self._live(scope, normalized, now)
+            kind, score = "exact", 1.0
+            if match is None and threshold < 1.0:
+                match, score = self._nearest(scope, normalized, threshold, now)
+                kind = "similar"
+            if match is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(match)
+            entry = self._entries[match]
+            if kind == "exact":
+                self.exact_hits += 1
+            else:
+                self.similar_hits += 1
+            self.saved_seconds += entry.latency
+            return CachedAnswer(entry.answer, kind, score, entry.latency)
+
+    def store(self, scope: str, prompt: str, answer: str, latency: float) -> None:
+        normalized = normalize_prompt(prompt)
+        if not normalized or not answer:
+            return
+        key = (scope, normalized)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(answer, latency, self._clock(), shingles(normalized), numbers(normalized))
+            self._by_scope.setdefault(scope, {})[normalized] = None
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _live(self, scope: str, normalized: str, now: float) -> Tuple[str, str] | None:
+        key = (scope, normalized)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry.stored_at > self.ttl_seconds:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        return key
+
+    def _nearest(self, scope: str, normalized: str, threshold: float, now: float) -> Tuple[Tuple[str, str] | None, float]:
+        wanted_shingles, wanted_numbers = shingles(normalized), numbers(normalized)
+        best, best_score = None, threshold
+        for candidate in list(self._by_scope.get(scope, ())):
+            key = self._live(scope, candidate, now)
+            if key is None:
+                continue
+            entry = self._entries[key]
+            if entry.numbers != wanted_numbers:
+                continue
+            score = len(wanted_shingles & entry.shingles) / len(wanted_shingles | entry.shingles)
+            if score >= best_score:
+                best, best_score = key, score
+        return best, best_score
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        scope_prompts = self._by_scope.get(key[0])
+        if scope_prompts is not None:
+            scope_prompts.pop(key[1], None)
+            if not scope_prompts:
+                del self._by_scope[key[0]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_scope.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "lookups": lookups,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,169 @@
+"""Durable chat sessions in SQLite: transcripts, memory and extracted documents survive reconnects and restarts.
+
+The database runs in WAL mode, so readers never block the single writer and a crash loses at most the
+transaction in flight. Transcript rows are appended turn by turn rather than rewritten. Documents are stored as
+zlib-compressed JSON without their retrieval chunks, which are rebuilt from the text when the document is next
+loaded.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from finance_chatbot.document_index import build_chunks
+from finance_chatbot.documents import RETRIEVAL_CHUNK_CHARS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (session_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS documents (
+    session_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (session_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+
+def encode_document(doc: dict) -> bytes:
+    stored = {key: value for key, value in doc.items() if key != "chunks"}
+    stored["indexed"] = bool(doc.get("chunks"))
+    return zlib.compress(json.dumps(stored, ensure_ascii=False).encode("utf-8"))
+
+
+def decode_document(payload: bytes) -> dict:
+    doc = json.loads(zlib.decompress(payload).decode("utf-8"))
+    indexed = doc.pop("indexed")
+    doc["chunks"] = build_chunks(doc["content"], RETRIEVAL_CHUNK_CHARS) if indexed else None
+    return doc
+
+
+class SessionStore:
+    """Thread-safe: one connection shared behind a lock, since every statement here is short."""
+
+    def __init__(self, path: str, retention_days: float = 30, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(SCHEMA)
+        if retention_days:
+            self.prune(retention_days * 86400)
+
+    def save(
+        self,
+        session_id: str,
+        state: dict,
+        messages: List[dict] | None = None,
+        messages_from: int = 0,
+        documents: List[dict] | None = None,
+    ) -> None:
+        """Upserts ``state`` and appends ``messages[messages_from:]``; 0 rewrites the transcript.
+
+        Appended rows go after whatever the database already holds, not at ``messages_from``: two tabs attached to
+        one session id each append their own turns instead of overwriting the other's. ``documents`` replaces the
+        stored set when given; ``None`` leaves it untouched.
+        """
+        with self._lock, self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (session_id, json.dumps(state, ensure_ascii=False), self._clock()),
+            )
+            if messages is not None:
+                if messages_from == 0:
+                    cursor.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                start = cursor.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+                cursor.executemany(
+                    "INSERT INTO messages (session_id, position, message) VALUES (?, ?, ?)",
+                    [
+                        (session_id, position, json.dumps(message, ensure_ascii=False))
+                        for position, message in enumerate(messages[messages_from:], start=start)
+                    ],
+                )
+            if documents is not None:
+                cursor.execute("DELETE FROM documents WHERE session_id = ?", (session_id,))
+                cursor.executemany(
+                    "INSERT INTO documents (session_id, position, payload) VALUES (?, ?, ?)",
+                    [(session_id, position, encode_document(doc)) for position, doc in enumerate(documents)],
+                )
+
+    def load_state(self, session_id: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_messages(self, session_id: str) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT message FROM messages WHERE session_id = ? ORDER BY position", (session_id,)
+            ).fetchall()
+        return [json.loads(message) for (message,) in rows]
+
+    def load_documents(self, session_id: str) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload FROM documents WHERE session_id = ? ORDER BY position", (session_id,)
+            ).fetchall()
+        return [decode_document(payload) for (payload,) in rows]
+
+    def session_ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT session_id FROM sessions ORDER BY updated_at")]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._transaction() as cursor:
+            for table in ("messages", "documents", "sessions"):
+                cursor.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Deletes sessions untouched for ``older_than_seconds``; returns how many went."""
+        cutoff = self._clock() - older_than_seconds
+        with self._lock, self._transaction() as cursor:
+            stale = [row[0] for row in cursor.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,))]
+            for table in ("messages", "documents", "sessions"):
+                cursor.executemany(f"DELETE FROM {table} WHERE session_id = ?", [(session_id,) for session_id in stale])
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {
+                table: self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("sessions", "messages", "documents")
+            }
+            pages = self._connection.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._connection.execute("PRAGMA page_size").fetchone()[0]
+        return {**counts, "mib": pages * page_size / 2**20}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection.cursor()
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
@@ -0,0 +1,50 @@
+"""Theme choices and their CSS, built once per process rather than on every Streamlit rerun."""
+
+THEME_OPTIONS = ["System default", "Light", "Dark"]
+DARK_THEME_CSS = """
+<style>
+:root {
+    color-scheme: dark;
+}
+html, body, [data-testid='stAppViewContainer'] {
+    background-color: #0f172a;
+    color: #f8fafc;
+}
+[data-testid='stSidebar'] {
+    background-color: #111827;
+}
+.stButton>button {
+    background-color: #e11d48;
+    color: #f8fafc;
+    border: none;
+}
+.stSelectbox, .stTextInput, .stSlider, .stTextArea {
+    color: inherit;
+}
+</style>
+"""
+LIGHT_THEME_CSS = """
+<style>
+:root {
+    color-scheme: light;
+}
+html, body, [data-testid='stAppViewContainer'] {
+    background-color: #ffffff;
+    color: #0f172a;
+}
+[data-testid='stSidebar'] {
+    background-color: #f5f7fb;
+}
+.stButton>button {
+    background-color: #ef4444;
+    color: #ffffff;
+    border: none;
+}
+</style>
+"""
+DEFAULT_THEME_CSS = """<style></style>"""
+THEME_CSS = {"Dark": DARK_THEME_CSS, "Light": LIGHT_THEME_CSS}
+
+
+def theme_css(choice: str) -> str:
+    return THEME_CSS.get(choice, DEFAULT_THEME_CSS)
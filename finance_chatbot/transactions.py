@@ -0,0 +1,480 @@
+"""Bank-statement transaction parsing into a columnar table, with precomputed aggregates."""
+
+import csv
+import math
+import re
+import statistics
+from array import array
+from collections import Counter, defaultdict
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from finance_chatbot.csv_digest import format_number, parse_date_parts, parse_number
+
+MIN_TRANSACTIONS = 3
+MAX_DESCRIPTION_CHARS = 60
+TOP_CATEGORIES = 8
+MAX_RECURRING = 8
+MAX_OVERDRAFTS = 5
+MAX_MONTHS = 12
+RECURRING_MIN_MONTHS = 3
+RECURRING_AMOUNT_TOLERANCE = 0.1
+RECURRING_MAX_PER_MONTH = 3
+
+MONTH_NAMES = {
+    **{name: number for number, name in enumerate(["jan", "feb", "mar", "apr", "may", "jun"], start=1)},
+    **{name: number for number, name in enumerate(["jul", "aug", "sep", "oct", "nov", "dec"], start=7)},
+    "mei": 5,
+    "agu": 8,
+    "agt": 8,
+    "okt": 10,
+    "des": 12,
+}
+DATE_AT_START = re.compile(
+    r"^\s*(?:(?P<iso>\d{4}[-/.]\d{1,2}[-/.]\d{1,2})|(?P<numeric>\d{1,2}[-/.]\d{1,2}[-/.]\d{4})"
+    r"|(?P<day>\d{1,2})[\s-](?P<month>[A-Za-z]{3})[a-z]*\.?[\s-](?P<year>\d{4}))(?=[\s,;|\t]|$)"
+)
+CURRENCY_CODES = {"USD", "IDR", "EUR", "GBP", "JPY", "SGD", "AUD", "CAD", "CHF", "CNY", "MYR"}
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "Rp": "IDR"}
+DEBIT_MARKERS = {"DR", "DB", "D", "DEBIT"}
+CREDIT_MARKERS = {"CR", "K", "C", "CREDIT", "KREDIT"}
+MERCHANT_NOISE = re.compile(r"[#*]?\d+|[^\w\s]")
+OVERDRAFT_FEE = re.compile(r"\b(?:overdraft|od fee|cerukan|insufficient funds)\b", re.IGNORECASE)
+BALANCE_ROW = re.compile(
+    r"\b(?:opening|closing|beginning|ending|starting|previous|new)\s+balance\b"
+    r"|\bbalance\s+(?:brought|carried)\s+forward\b|\bsaldo\s+(?:awal|akhir)\b",
+    re.IGNORECASE,
+)
+BALANCE_TOLERANCE = 0.01
+
+HEADER_ROLES = {
+    "date": ("date", "tanggal", "tgl", "posted", "booking", "transaction date", "value date"),
+    "description": ("description", "desc", "details", "narrative", "keterangan", "merchant", "payee", "memo", "uraian"),
+    "amount": ("amount", "jumlah", "nominal", "value", "nilai"),
+    "debit": ("debit", "withdrawal", "money out", "paid out", "keluar"),
+    "credit": ("credit", "deposit", "money in", "paid in", "masuk", "kredit"),
+    "balance": ("balance", "saldo"),
+    "currency": ("currency", "ccy", "mata uang"),
+    "category": ("category", "kategori"),
+}
+CATEGORY_RULES = [
+    ("Income", ("salary", "payroll", "gaji", "wage", "interest earned", "dividend")),
+    ("Rent & housing", ("rent", "housing", "mortgage", "sewa", "kost", "landlord")),
+    ("Groceries", ("grocery", "groceries", "supermarket", "mart", "market", "alfamart", "indomaret")),
+    ("Dining", ("restaurant", "cafe", "coffee", "dining", "food", "grabfood", "gofood", "makan")),
+    ("Transport", ("transport", "metro", "fuel", "gas station", "uber", "grab", "gojek", "parking", "toll", "bensin")),
+    ("Utilities", ("utility", "utilities", "electric", "power", "water", "internet", "pln", "telkom", "phone")),
+    ("Subscriptions", ("subscription", "netflix", "spotify", "stream", "youtube", "icloud", "prime")),
+    ("Insurance", ("insurance", "asuransi", "cover", "bpjs")),
+    ("Fees & charges", ("fee", "charge", "biaya", "admin", "overdraft", "interest")),
+    ("Transfers", ("transfer", "trf", "atm", "withdrawal", "tarik tunai")),
+]
+UNCATEGORISED = "Other"
+
+
+class TransactionTable:
+    """Columnar store: one typed array per field, text fields dictionary-encoded into a shared string pool.
+
+    Dates are kept as ``year*10000 + a*100 + b``; ambiguous dd/mm vs mm/dd dates are stored negated and resolved
+    through ``day_first`` once the whole statement has been seen.
+    """
+
+    def __init__(self):
+        self.date_keys = array("i")
+        self.amounts = array("d")
+        self.balances = array("d")
+        self.descriptions = array("i")
+        self.categories = array("i")
+        self.currencies = array("i")
+        self.day_first = False
+        self._strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def intern(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def text(self, code: int) -> str:
+        return self._strings[code]
+
+    def append(
+        self,
+        parts: Tuple[int, int, int],
+        description: str,
+        amount: float,
+        currency: str,
+        balance: float | None,
+        category: str,
+    ) -> None:
+        year, first, second = parts
+        if first < 0:
+            self.day_first = self.day_first or -first > 12
+            self.date_keys.append(-(year * 10000 - first * 100 + second))
+        else:
+            self.date_keys.append(year * 10000 + first * 100 + second)
+        self.amounts.append(amount)
+        self.balances.append(math.nan if balance is None else balance)
+        self.descriptions.append(self.intern(description))
+        self.categories.append(self.intern(category))
+        self.currencies.append(self.intern(currency))
+
+    def date_at(self, index: int) -> date | None:
+        key = self.date_keys[index]
+        year, first, second = abs(key) // 10000, abs(key) // 100 % 100, abs(key) % 100
+        month, day = (second, first) if key < 0 and self.day_first else (first, second)
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+
+def match_role(name: str) -> str | None:
+    lowered = name.strip().lower()
+    for role, hints in HEADER_ROLES.items():
+        if any(lowered == hint or lowered.startswith(hint + " ") or lowered.endswith(" " + hint) for hint in hints):
+            return role
+    return None
+
+
+@lru_cache(maxsize=4096)
+def categorise(text: str) -> str:
+    lowered = text.lower()
+    for category, keywords in CATEGORY_RULES:
+        if any(keyword in lowered for keyword in keywords):
+            return category
+    return UNCATEGORISED
+
+
+def parse_date_text(text: str) -> Tuple[int, int, int] | None:
+    match = DATE_AT_START.match(text)
+    if match is None:
+        return None
+    if match.group("month"):
+        month = MONTH_NAMES.get(match.group("month").lower())
+        return (int(match.group("year")), month, int(match.group("day"))) if month else None
+    return parse_date_parts(match.group("iso") or match.group("numeric"))
+
+
+def currency_of(token: str) -> str | None:
+    cleaned = token.strip().rstrip(".")
+    if cleaned.upper() in CURRENCY_CODES:
+        return cleaned.upper()
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if cleaned.startswith(symbol):
+            return code
+    return None
+
+
+def split_fields(rest: str) -> Tuple[List[str], bool]:
+    for delimiter in ("\t", ";", "|"):
+        if delimiter in rest:
+            return next(csv.reader([rest.strip(delimiter + " ")], delimiter=delimiter)), True
+    # A comma followed by a non-digit separates fields; "1,234.56" does not.
+    if rest.lstrip().startswith(",") or re.search(r",\s*[^\d\s]", rest):
+        return next(csv.reader([rest.strip().lstrip(",")])), True
+    return rest.split(), False
+
+
+class StatementParser:
+    """Feeds CSV rows or text lines into a ``TransactionTable``; lines that are not transactions are kept aside."""
+
+    def __init__(self, default_currency: str = ""):
+        self.table = TransactionTable()
+        self.default_currency = default_currency
+        self.other_lines: List[str] = []
+        self._roles: Dict[str, int] | None = None
+        # Text rows whose direction was not printed, and opening/closing balances keyed by the row they precede.
+        self._unsigned: List[int] = []
+        self._anchors: Dict[int, float] = {}
+        self._explicit_debits = 0
+
+    def feed_row(self, header: List[str], row: List[str]) -> None:
+        if self._roles is None:
+            self._roles = {}
+            for index, name in enumerate(header):
+                role = match_role(name)
+                if role and role not in self._roles:
+                    self._roles[role] = index
+        roles = self._roles
+        if "date" not in roles or not ({"amount", "debit", "credit"} & roles.keys()):
+            return
+
+        def cell(role: str) -> str:
+            index = roles.get(role)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        parts = parse_date_text(cell("date"))
+        if parts is None:
+            return
+        if "amount" in roles:
+            amount = parse_number(cell("amount"))
+        else:
+            debit, credit = parse_number(cell("debit")) or 0.0, parse_number(cell("credit")) or 0.0
+            amount = abs(credit) - abs(debit) if (debit or credit) else None
+        if amount is None:
+            return
+        description = cell("description") or " ".join(
+            value for index, value in enumerate(row) if index not in roles.values() and value.strip()
+        )
+        if BALANCE_ROW.search(description):
+            return
+        currency = currency_of(cell("currency")) or currency_of(cell("amount")) or self.default_currency
+        category = cell("category") or categorise(description)
+        self.table.append(
+            parts, description[:MAX_DESCRIPTION_CHARS], amount, currency, parse_number(cell("balance")), category
+        )
+
+    def feed_line(self, line: str) -> None:
+        match = DATE_AT_START.match(line)
+        parts = parse_date_text(line) if match else None
+        if parts is None:
+            if line.strip():
+                self.other_lines.append(line.strip())
+            return
+        fields, delimited = split_fields(line[match.end() :])
+        amounts: List[float] = []
+        amount_tokens: List[str] = []
+        text: List[str] = []
+        currency = ""
+        sign = 0
+        if delimited:
+            for field in fields:
+                field = field.strip()
+                number = parse_number(field)
+                if number is not None:
+                    amounts.append(number)
+                    amount_tokens.append(field)
+                elif currency_of(field) and len(field) <= 4:
+                    currency = currency_of(field)
+                elif field.upper() in DEBIT_MARKERS | CREDIT_MARKERS:
+                    sign = -1 if field.upper() in DEBIT_MARKERS else 1
+                elif field:
+                    text.append(field)
+        else:
+            # Whitespace layouts: amounts, markers and currency codes trail the description.
+            tokens = list(fields)
+            while tokens:
+                token = tokens[-1]
+                number = parse_number(token)
+                if number is not None and len(amounts) < 2:
+                    amounts.insert(0, number)
+                    amount_tokens.insert(0, token)
+                    currency = currency or currency_of(token) or ""
+                elif token.upper() in DEBIT_MARKERS | CREDIT_MARKERS:
+                    sign = sign or (-1 if token.upper() in DEBIT_MARKERS else 1)
+                elif currency_of(token) and len(token) <= 4:
+                    currency = currency_of(token)
+                else:
+                    break
+                tokens.pop()
+            text = tokens
+        if not amounts:
+            self.other_lines.append(line.strip())
+            return
+        description = " ".join(text)
+        if BALANCE_ROW.search(description):
+            # Not a transaction, but the balance it states tells the direction of the row after it.
+            self._anchors[len(self.table)] = amounts[-1]
+            self.other_lines.append(line.strip())
+            return
+        amount = -abs(amounts[0]) if sign < 0 else abs(amounts[0]) if sign > 0 else amounts[0]
+        balance = amounts[-1] if len(amounts) > 1 else None
+        if amount < 0:
+            self._explicit_debits += 1
+        elif not sign and not amount_tokens[0].startswith("+"):
+            self._unsigned.append(len(self.table))
+        self.table.append(
+            parts,
+            description[:MAX_DESCRIPTION_CHARS],
+            amount,
+            currency or self.default_currency,
+            balance,
+            categorise(description),
+        )
+
+
+    def resolve_signs(self) -> bool:
+        """Signs unmarked text rows from the change in the running balance; False when some stay unknown.
+
+        The statement's row order (oldest or newest first) is whichever explains more balance changes. Without a
+        balance, an unmarked amount is only taken as an inflow when the statement prints its debits as negatives.
+        """
+        table = self.table
+        if not self._unsigned:
+            return True
+
+        def balance_before(index: int) -> float:
+            return self._anchors.get(index, table.balances[index - 1] if index > 0 else math.nan)
+
+        def balance_after(index: int) -> float:
+            return self._anchors.get(index + 1, table.balances[index + 1] if index + 1 < len(table) else math.nan)
+
+        def explains(index: int, neighbour: float) -> bool:
+            return abs(abs(table.balances[index] - neighbour) - abs(table.amounts[index])) <= BALANCE_TOLERANCE
+
+        oldest_first = sum(explains(index, balance_before(index)) for index in range(len(table)))
+        newest_first = sum(explains(index, balance_after(index)) for index in range(len(table)))
+        neighbour_of = balance_after if newest_first > oldest_first else balance_before
+        unresolved = 0
+        for index in self._unsigned:
+            neighbour = neighbour_of(index)
+            if explains(index, neighbour) and table.balances[index] != neighbour:
+                table.amounts[index] = math.copysign(table.amounts[index], table.balances[index] - neighbour)
+            else:
+                unresolved += 1
+        return not unresolved or self._explicit_debits > 0
+
+
+def merchant_key(description: str) -> str:
+    words = [word for word in MERCHANT_NOISE.sub(" ", description.lower()).split() if word[:3] not in MONTH_NAMES]
+    return " ".join(words[:3])
+
+
+class StatementAggregates:
+    """Single pass over the table rows in the dominant currency; all state is bounded by merchants x months."""
+
+    def __init__(self, table: TransactionTable):
+        self.table = table
+        self.currency_code, _ = Counter(table.currencies).most_common(1)[0]
+        self.rows = 0
+        self.first: date | None = None
+        self.last: date | None = None
+        self.inflow = 0.0
+        self.outflow = 0.0
+        self.spending: Dict[int, List[float]] = defaultdict(lambda: [0.0, 0])
+        self.monthly: Dict[Tuple[int, int], List[float]] = defaultdict(lambda: [0.0, 0.0])
+        self.charges: Dict[str, Dict[Tuple[int, int], List[float]]] = defaultdict(dict)
+        self.frequent: set = set()
+        self.labels: Dict[str, int] = {}
+        # Per day: lowest balance and the balance after the day's last row, so overdrafts need no per-row state.
+        self.daily_balances: Dict[date, List[float]] = {}
+        self.lowest_balance: float | None = None
+        self.fee_lines = 0
+        self._dates: Dict[int, date | None] = {}
+        self._merchants: Dict[int, Tuple[str, bool]] = {}
+        for index in range(len(table)):
+            if table.currencies[index] == self.currency_code:
+                self.observe(index)
+
+    def date_at(self, index: int) -> date | None:
+        key = self.table.date_keys[index]
+        if key not in self._dates:
+            self._dates[key] = self.table.date_at(index)
+        return self._dates[key]
+
+    def observe(self, index: int) -> None:
+        table = self.table
+        amount = table.amounts[index]
+        when = self.date_at(index)
+        self.rows += 1
+        if amount > 0:
+            self.inflow += amount
+        else:
+            self.outflow += amount
+            totals = self.spending[table.categories[index]]
+            totals[0] += amount
+            totals[1] += 1
+        description = table.descriptions[index]
+        if description not in self._merchants:
+            text = table.text(description)
+            self._merchants[description] = (merchant_key(text), bool(OVERDRAFT_FEE.search(text)))
+        merchant, is_fee = self._merchants[description]
+        self.fee_lines += is_fee
+        balance = table.balances[index]
+        if not math.isnan(balance):
+            self.lowest_balance = balance if self.lowest_balance is None else min(self.lowest_balance, balance)
+        if when is None:
+            return
+        self.first = when if self.first is None or when < self.first else self.first
+        self.last = when if self.last is None or when > self.last else self.last
+        month = (when.year, when.month)
+        self.monthly[month][0 if amount > 0 else 1] += amount
+        if not math.isnan(balance):
+            day = self.daily_balances.setdefault(when, [balance, balance])
+            day[0] = min(day[0], balance)
+            day[1] = balance
+        if amount < 0 and merchant and merchant not in self.frequent:
+            self.labels.setdefault(merchant, description)
+            charges = self.charges[merchant].setdefault(month, [])
+            charges.append(-amount)
+            # More than a few charges a month is everyday spending, not a recurring bill.
+            if len(charges) > RECURRING_MAX_PER_MONTH:
+                self.frequent.add(merchant)
+                del self.charges[merchant]
+
+    def recurring(self) -> List[dict]:
+        found = []
+        for merchant, by_month in self.charges.items():
+            if len(by_month) < RECURRING_MIN_MONTHS:
+                continue
+            monthly = [min(values, key=lambda value: abs(value - statistics.median(values))) for values in by_month.values()]
+            typical = statistics.median(monthly)
+            consistent = [value for value in monthly if abs(value - typical) <= RECURRING_AMOUNT_TOLERANCE * typical]
+            if len(consistent) >= RECURRING_MIN_MONTHS and len(consistent) >= 0.75 * len(monthly):
+                label = self.table.text(self.labels[merchant])
+                found.append({"merchant": label, "amount": typical, "months": len(consistent)})
+        found.sort(key=lambda item: item["amount"] * item["months"], reverse=True)
+        return found
+
+    def overdrafts(self) -> List[Tuple[date, float]]:
+        events = []
+        overdrawn = False
+        for when, (lowest, closing) in sorted(self.daily_balances.items()):
+            if lowest < 0 and not overdrawn:
+                events.append((when, lowest))
+            overdrawn = closing < 0
+        return events
+
+
+def summarize_statement(table: TransactionTable) -> str:
+    if len(table) < MIN_TRANSACTIONS:
+        return ""
+    stats = StatementAggregates(table)
+    currency = table.text(stats.currency_code) or "statement currency"
+    lines = [f"Statement transactions: {len(table):,} parsed"]
+    if stats.first:
+        lines[0] += f" from {stats.first.isoformat()} to {stats.last.isoformat()}"
+    excluded = len(table) - stats.rows
+    lines.append(f"Amounts in {currency}" + (f" ({excluded:,} rows in other currencies excluded)" if excluded else ""))
+    lines.append(
+        f"Totals: in {format_number(stats.inflow)}; out {format_number(stats.outflow)}; "
+        f"net {format_number(stats.inflow + stats.outflow)}"
+    )
+
+    if stats.spending:
+        lines.append("Spending by category (total, count, share of spending):")
+        for code, (total, count) in sorted(stats.spending.items(), key=lambda item: item[1][0])[:TOP_CATEGORIES]:
+            share = total / stats.outflow * 100 if stats.outflow else 0.0
+            lines.append(f"- {table.text(code)}: {format_number(total)} ({count:,}, {share:.0f}%)")
+
+    if len(stats.monthly) > 1:
+        lines.append("Monthly in / out / net:")
+        for (year, month), (month_in, month_out) in sorted(stats.monthly.items())[-MAX_MONTHS:]:
+            lines.append(
+                f"{year:04d}-{month:02d}: {format_number(month_in)} / {format_number(month_out)} / "
+                f"{format_number(month_in + month_out)}"
+            )
+
+    charges = stats.recurring()
+    if charges:
+        lines.append("Recurring charges (typical monthly amount, months seen):")
+        lines.extend(
+            f"- {item['merchant']}: {format_number(item['amount'])} ({item['months']})" for item in charges[:MAX_RECURRING]
+        )
+
+    events = stats.overdrafts()
+    if events or stats.fee_lines:
+        lines.append(f"Overdraft events: {len(events)}; overdraft fee lines: {stats.fee_lines}")
+        lines.extend(f"- {when.isoformat()}: balance {format_number(balance)}" for when, balance in events[:MAX_OVERDRAFTS])
+    elif stats.lowest_balance is not None:
+        lines.append("Overdraft events: none (balance never below zero)")
+    if stats.lowest_balance is not None:
+        lines.append(f"Lowest balance: {format_number(stats.lowest_balance)}")
+    return "\n".join(lines)